@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Benchmark Corpora
+
+Writes reproducible synthetic markdown trees of different shapes. The same
+shape, scale and seed always produce byte-identical files, so timings from
+different commits are comparable.
+
+Shapes:
+- tiny: many short notes in one folder
+- deep: a tree of nested folders with a few medium pages in each
+- tables: documents made mostly of large pipe tables
+- huge: one very large file, 12 MB at scale 1, for the split target of
+  run.py (see split_merge.py)
+- images: pages that share a small set of large PNG screenshots
+
+Usage: python benchmarks/corpus.py tiny /tmp/corpus --scale 2
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import argparse
+import random
+import shutil
+import struct
+import zlib
+from pathlib import Path
+
+WORDS = ('the', 'converter', 'document', 'pandoc', 'markdown', 'table', 'image', 'folder',
+         'release', 'section', 'install', 'option', 'quickly', 'output', 'format', 'style',
+         'between', 'value', 'server', 'cache', 'result', 'reference', 'heading', 'list')
+
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def paragraph(rng, sentences=4):
+    return ' '.join(sentence(rng, rng.randint(6, 16)) for _ in range(sentences))
+
+
+def page(rng, title, sections=4):
+    """A page with headings, paragraphs, a list, some emphasis and a code block"""
+    parts = [f"# {title}", paragraph(rng)]
+    for number in range(1, sections + 1):
+        parts.append(f"## Section {number}")
+        parts.append(paragraph(rng, rng.randint(2, 6)))
+        parts.append('\n'.join(f"- {sentence(rng, 5)} **{rng.choice(WORDS)}**" for _ in range(rng.randint(2, 5))))
+        if rng.random() < 0.5:
+            parts.append("```python\n" + '\n'.join(
+                f"{rng.choice(WORDS)}_{i} = {rng.randint(0, 999)}" for i in range(rng.randint(3, 8))) + "\n```")
+    return '\n\n'.join(parts) + '\n'
+
+
+def table(rng, rows, columns):
+    header = '| ' + ' | '.join(f"Column {c}" for c in range(1, columns + 1)) + ' |'
+    rule = '|' + '---|' * columns
+    body = ['| ' + ' | '.join(f"{rng.choice(WORDS)} {rng.randint(0, 9999)}" for _ in range(columns)) + ' |'
+            for _ in range(rows)]
+    return '\n'.join([header, rule] + body)
+
+
+def png(rng, width, height):
+    """An 8-bit grayscale PNG of noise, written without any imaging library"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + rng.getrandbits(8 * width).to_bytes(width, 'little') for _ in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows, 6))
+            + chunk(b'IEND', b''))
+
+
+def make_tiny(directory, rng, scale):
+    for number in range(int(400 * scale)):
+        (directory / f"note{number:05d}.md").write_text(
+            f"# Note {number}\n\n{sentence(rng)}\n\n- {sentence(rng, 4)}\n", encoding='utf-8')
+
+
+def make_deep(directory, rng, scale, depth=6, breadth=2):
+    count = 0
+    folders = [directory]
+    for level in range(depth):
+        next_folders = []
+        for folder in folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            for number in range(max(1, int(2 * scale))):
+                (folder / f"page{number}.md").write_text(page(rng, f"Level {level} page {count}"), encoding='utf-8')
+                count += 1
+            next_folders += [folder / f"part{b}" for b in range(breadth)]
+        folders = next_folders
+
+
+def make_tables(directory, rng, scale):
+    for number in range(int(40 * scale)):
+        parts = [f"# Report {number}"]
+        for t in range(8):
+            parts.append(f"## Table {t}")
+            parts.append(table(rng, rows=40, columns=6))
+        (directory / f"report{number:04d}.md").write_text('\n\n'.join(parts) + '\n', encoding='utf-8')
+
+
+def make_huge(directory, rng, scale):
+    target = int(12 * 1024 * 1024 * scale)
+    written = 0
+    chapter = 0
+    with open(directory / 'reference.md', 'w', encoding='utf-8') as f:
+        while written < target:
+            chapter += 1
+            text = page(rng, f"Chapter {chapter}", sections=12) + '\n'
+            f.write(text)
+            written += len(text)
+
+
+def make_images(directory, rng, scale, shared=8):
+    image_dir = directory / 'img'
+    image_dir.mkdir(parents=True, exist_ok=True)
+    for number in range(shared):
+        (image_dir / f"screenshot{number}.png").write_bytes(png(rng, 1600, 1000))
+    for number in range(int(40 * scale)):
+        parts = [page(rng, f"Guide {number}", sections=2)]
+        for shot in rng.sample(range(shared), 3):
+            parts.append(f"![Screenshot {shot}](img/screenshot{shot}.png)")
+        (directory / f"guide{number:04d}.md").write_text('\n\n'.join(parts) + '\n', encoding='utf-8')
+
+
+SHAPES = {
+    'tiny': make_tiny,
+    'deep': make_deep,
+    'tables': make_tables,
+    'huge': make_huge,
+    'images': make_images,
+}
+
+
+def generate(shape, directory, scale=1.0, seed=0):
+    """(Re)create the corpus for shape in directory and return its path"""
+    directory = Path(directory)
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+    SHAPES[shape](directory, random.Random(f"{shape}:{seed}"), scale)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic markdown corpus for benchmarks")
+    parser.add_argument('shape', choices=sorted(SHAPES))
+    parser.add_argument('directory', help='Folder to write the corpus to (replaced if it exists)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply file counts and sizes (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+    directory = generate(args.shape, args.directory, args.scale, args.seed)
+    files = [path for path in directory.rglob('*') if path.is_file()]
+    print(f"Wrote {len(files)} files ({sum(path.stat().st_size for path in files)} bytes) to {directory}")
+
+
+if __name__ == '__main__':
+    main()
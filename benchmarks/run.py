@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Benchmarks
+
+Converts the synthetic corpora from corpus.py through each entry point and
+reports throughput and latency:
+
+- cli: markdown_to_docx_converter.main() on the whole tree (parallel, --jobs)
+- split: the same with --split-threshold 1, so the huge shape is converted
+  in pieces and merged at any --scale from 0.5 up (the default threshold
+  of 8 MB only splits it from about 0.7); only run for huge
+- convert: convert_markdown_to_docx() on one file after another
+- web: the web interface's process_conversion() with the files as uploads
+  (not for the images shape: the web interface only accepts markdown, so
+  the images the pages refer to could never be resolved)
+
+For every shape and target it records files/sec, p50/p95/p99 per-file
+latency, peak RSS (of the benchmark process and of its pandoc children) and
+the bytes written. Each combination runs in a fresh Python process so peak
+RSS is not inherited from the previous one.
+
+Results are written as JSON. With --baseline they are compared against an
+earlier results file; any metric that got worse by more than --threshold
+percent is reported and the exit status is 1, so the suite can gate CI.
+
+Usage:
+    python benchmarks/run.py -o results.json
+    python benchmarks/run.py --shapes tiny deep --targets cli --baseline baseline.json
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from corpus import SHAPES, generate
+
+TARGETS = ('cli', 'split', 'convert', 'web')
+# --split-threshold of the split target, in MB
+SPLIT_THRESHOLD_MB = 1
+# (shape, target) combinations that cannot be measured fairly, and why
+UNSUPPORTED = {
+    ('images', 'web'): 'the web interface only accepts markdown uploads, so the images are never embedded',
+}
+UNSUPPORTED.update({(shape, 'split'): f'no file is over {SPLIT_THRESHOLD_MB} MB, so nothing would be split'
+                    for shape in SHAPES if shape != 'huge'})
+DEFAULT_THRESHOLD = 10.0
+
+# metric -> True when a larger value is better
+COMPARED_METRICS = {
+    'files_per_sec': True,
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'peak_rss_mb': False,
+}
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of values (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its largest finished child, in MB"""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return round(max(own, children) / (1024 * 1024), 1)
+
+
+def output_bytes(directory):
+    return sum(path.stat().st_size for path in Path(directory).rglob('*') if path.is_file())
+
+
+def record_latencies(converter):
+    """
+    Wrap converter.convert_document so every call's duration is recorded.
+
+    Returns (latencies, failures): a list of seconds and a list that gets
+    one item per conversion that raised.
+    """
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    original = converter.convert_document
+
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        except Exception as e:
+            with lock:
+                failures.append(e)
+            raise
+        finally:
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    converter.convert_document = timed
+    return latencies, failures
+
+
+def run_cli(converter, corpus, output_dir, jobs, options=()):
+    argv = sys.argv
+    sys.argv = ['markdown_to_docx_converter.py', '-i', str(corpus), '-o', str(output_dir)] + list(options)
+    if jobs:
+        sys.argv += ['-j', str(jobs)]
+    try:
+        converter.main()
+    finally:
+        sys.argv = argv
+    return output_dir
+
+
+def run_split(converter, corpus, output_dir, jobs):
+    return run_cli(converter, corpus, output_dir, jobs, ['--split-threshold', str(SPLIT_THRESHOLD_MB)])
+
+
+def run_convert(converter, corpus, output_dir, jobs):
+    for md_file in converter.find_markdown_files(corpus):
+        output_path = converter.preserve_folder_structure(md_file, corpus, output_dir) / f"{md_file.stem}.docx"
+        converter.convert_markdown_to_docx(md_file, output_path)
+    return output_dir
+
+
+def run_web(converter, corpus, output_dir, jobs):
+    import markdown_converter_web as web
+    # Upload each file under its relative path; process_conversion() turns the
+    # separators into underscores, so page0.md in every folder stays distinct
+    file_data = [{'filename': md_file.relative_to(corpus).as_posix(), 'content': md_file.read_bytes()}
+                 for md_file in converter.find_markdown_files(corpus)]
+    flat_names = {file_info['filename'].replace('/', '_') for file_info in file_data}
+    if len(flat_names) != len(file_data):
+        raise RuntimeError("Upload names collide once flattened; the web results would not be comparable")
+    job = web.process_conversion(file_data)
+    if job['status'] != 'completed':
+        raise RuntimeError(job['message'])
+    return job['output_dir']
+
+
+RUNNERS = {'cli': run_cli, 'split': run_split, 'convert': run_convert, 'web': run_web}
+
+
+def run_one(shape, target, corpus, jobs=None):
+    """Benchmark one target on one corpus in this process; returns the result dict"""
+    import markdown_to_docx_converter as converter
+    latencies, failures = record_latencies(converter)
+    files = len(converter.find_markdown_files(corpus))
+    scratch = tempfile.mkdtemp(prefix='md_to_docx_bench_')
+    try:
+        started = time.perf_counter()
+        # The converters print a line or two per file; keep the report readable
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            output_dir = RUNNERS[target](converter, corpus, Path(scratch) / 'out', jobs)
+        elapsed = time.perf_counter() - started
+        written = output_bytes(output_dir)
+        if target == 'web':
+            shutil.rmtree(output_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {
+        'shape': shape,
+        'target': target,
+        'files': files,
+        'failed': len(failures),
+        'seconds': round(elapsed, 3),
+        'files_per_sec': round(files / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'peak_rss_mb': peak_rss_mb(),
+        'bytes_written': written,
+    }
+
+
+def environment():
+    try:
+        import pypandoc
+        pandoc = pypandoc.get_pandoc_version()
+    except (ImportError, OSError):
+        pandoc = None
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pandoc': pandoc,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Lines describing every metric that regressed by more than threshold percent"""
+    previous = {(r['shape'], r['target']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result['shape'], result['target']))
+        if before is None:
+            continue
+        if result['failed'] > before.get('failed', 0):
+            regressions.append(f"{result['shape']}/{result['target']}: failed {before.get('failed', 0)} -> "
+                               f"{result['failed']}")
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{result['shape']}/{result['target']}: {metric} {old} -> {new} "
+                                   f"({change:+.1f}%)")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'shape':<8} {'target':<8} {'files':>6} {'failed':>6} {'files/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'RSS MB':>8} {'written':>12}")
+    for r in results:
+        print(f"{r['shape']:<8} {r['target']:<8} {r['files']:>6} {r['failed']:>6} {r['files_per_sec']:>9} {r['p50_ms']:>9} "
+              f"{r['p95_ms']:>9} {r['p99_ms']:>9} {str(r['peak_rss_mb']):>8} {r['bytes_written']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown to DOCX conversion")
+    parser.add_argument('--shapes', nargs='+', choices=sorted(SHAPES), default=sorted(SHAPES),
+                        help='Corpora to run (default: all)')
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS),
+                        help='Entry points to run (default: all)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Corpus scale, see corpus.py (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('-j', '--jobs', type=int, help='--jobs for the cli target (default: number of CPUs)')
+    parser.add_argument('--corpus-dir', help='Where to generate corpora (default: a temporary folder)')
+    parser.add_argument('-o', '--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against this earlier results file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Percent a metric may get worse before it counts as a regression '
+                             f'(default: {DEFAULT_THRESHOLD:g})')
+    # Internal: run one shape/target in this process and print its result
+    parser.add_argument('--one', nargs=3, metavar=('SHAPE', 'TARGET', 'CORPUS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        shape, target, corpus = args.one
+        print(json.dumps(run_one(shape, target, Path(corpus), args.jobs)))
+        return
+
+    corpus_root = Path(args.corpus_dir or tempfile.mkdtemp(prefix='md_to_docx_corpus_'))
+    results = []
+    skipped = []
+    try:
+        for shape in args.shapes:
+            corpus = generate(shape, corpus_root / shape, args.scale, args.seed)
+            for target in args.targets:
+                if (shape, target) in UNSUPPORTED:
+                    skipped.append({'shape': shape, 'target': target, 'reason': UNSUPPORTED[(shape, target)]})
+                    continue
+                print(f"Running {shape}/{target}...", flush=True)
+                command = [sys.executable, __file__, '--one', shape, target, str(corpus)]
+                if args.jobs:
+                    command += ['-j', str(args.jobs)]
+                completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                           universal_newlines=True)
+                if completed.returncode != 0:
+                    print(completed.stderr, file=sys.stderr)
+                    sys.exit(f"{shape}/{target} failed")
+                results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_root, ignore_errors=True)
+
+    report = {'environment': environment(), 'scale': args.scale, 'seed': args.seed, 'results': results,
+              'skipped': skipped}
+    print()
+    print_table(results)
+    for entry in skipped:
+        print(f"Skipped {entry['shape']}/{entry['target']}: {entry['reason']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        if (baseline.get('scale'), baseline.get('seed')) != (args.scale, args.seed):
+            print(f"\nWarning: baseline used scale {baseline.get('scale')} and seed {baseline.get('seed')}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions (more than {args.threshold:g}% worse than {args.baseline}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Conversion Cache
+
+A persistent, content-addressed cache of converted DOCX files. Entries are
+keyed on the SHA-256 of the markdown bytes, the conversion options and the
+pandoc version, so an unchanged file is never converted twice. A hit copies
+(or, where the filesystem supports it, reflinks) the stored DOCX instead of
+running pandoc.
+
+The cache is kept under a size budget; when it grows past the budget the
+least recently used entries are evicted first.
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'markdown-to-docx'
+DEFAULT_CACHE_SIZE_MB = 1024
+
+# Linux ioctl for copy-on-write clones (btrfs, XFS)
+FICLONE = 0x40049409
+
+
+def clone_file(source, destination):
+    """Copy source to destination, using a reflink when the filesystem allows it"""
+    try:
+        import fcntl
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(source, destination)
+
+
+def format_size(num_bytes):
+    """Format a byte count for humans"""
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class ConversionCache:
+    """On-disk LRU cache of converted DOCX files"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.objects_dir = self.directory / 'objects'
+        self.stats_path = self.directory / 'stats.json'
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._pandoc_version = None
+        self._lock = threading.Lock()
+        self._entries = None  # key -> (last used, size), loaded on first use
+        self._total_bytes = 0
+
+    def _load(self):
+        """Scan the objects directory once to learn sizes and last-use times"""
+        if self._entries is not None:
+            return
+        self._entries = {}
+        self._total_bytes = 0
+        if not self.objects_dir.exists():
+            return
+        for shard in os.scandir(self.objects_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.docx'):
+                    stat = entry.stat()
+                    self._entries[entry.name[:-5]] = (stat.st_mtime, stat.st_size)
+                    self._total_bytes += stat.st_size
+
+    def _path_for(self, key):
+        return self.objects_dir / key[:2] / f"{key}.docx"
+
+    def pandoc_version(self):
+        """pandoc version, looked up once per cache instance"""
+        if self._pandoc_version is None:
+            import pypandoc
+            self._pandoc_version = pypandoc.get_pandoc_version()
+        return self._pandoc_version
+
+    def key_for(self, data, options):
+        """Cache key for markdown bytes converted with the given options"""
+        digest = hashlib.sha256()
+        digest.update(data)
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        digest.update(self.pandoc_version().encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key, output_path):
+        """Copy the cached DOCX for key to output_path; returns False on a miss"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+        if entry is not None:
+            path = self._path_for(key)
+            try:
+                clone_file(path, output_path)
+                os.utime(path)  # Mark as recently used
+                with self._lock:
+                    self._entries[key] = (time.time(), entry[1])
+                    self.hits += 1
+                return True
+            except OSError:
+                # Removed behind our back (e.g. --clear-cache from another run)
+                with self._lock:
+                    if self._entries.pop(key, None):
+                        self._total_bytes -= entry[1]
+        with self._lock:
+            self.misses += 1
+        return False
+
+    def put(self, key, docx_path):
+        """Store a freshly converted DOCX under key"""
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary name first so readers never see a partial file
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            clone_file(docx_path, temp_name)
+            os.replace(temp_name, path)
+        except OSError:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            return
+        stat = path.stat()
+        with self._lock:
+            self._load()
+            previous = self._entries.get(key)
+            if previous:
+                self._total_bytes -= previous[1]
+            self._entries[key] = (stat.st_mtime, stat.st_size)
+            self._total_bytes += stat.st_size
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its budget"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                self._path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+            del self._entries[key]
+            self._total_bytes -= size
+
+    def _read_lifetime_stats(self):
+        try:
+            return json.loads(self.stats_path.read_text())
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def save_stats(self):
+        """Add this run's hits and misses to the lifetime counters"""
+        if not self.hits and not self.misses:
+            return
+        stats = self._read_lifetime_stats()
+        stats["hits"] = stats.get("hits", 0) + self.hits
+        stats["misses"] = stats.get("misses", 0) + self.misses
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.stats_path.write_text(json.dumps(stats))
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Return a dict describing the cache contents and lifetime hit rate"""
+        with self._lock:
+            self._load()
+            lifetime = self._read_lifetime_stats()
+            return {
+                "directory": str(self.directory),
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": lifetime.get("hits", 0),
+                "misses": lifetime.get("misses", 0),
+            }
+
+    def clear(self):
+        """Delete every cached file; returns the number of bytes freed"""
+        with self._lock:
+            self._load()
+            freed = self._total_bytes
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._entries = {}
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            return freed
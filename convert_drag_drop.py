@@ -115,8 +115,7 @@ def simple_user_interface():
     try:
         from markdown_to_docx_converter import (
             find_markdown_files, 
-            preserve_folder_structure, 
-            convert_markdown_to_docx,
+            convert_tree,
             setup_output_directory
         )
         
@@ -136,24 +135,31 @@ def simple_user_interface():
         print(f"📁 Output will be saved to: {output_dir}")
         print()
         
-        # Convert files
+        # Convert files (several at once, using every CPU core)
         successful = 0
         failed = 0
+        skipped = 0
+        done = 0
         
-        for i, md_file in enumerate(markdown_files, 1):
-            print(f"🔄 Converting file {i}/{len(markdown_files)}: {md_file.name}")
-            
-            # Preserve folder structure
-            output_folder = preserve_folder_structure(md_file, folder_path, output_dir)
-            docx_filename = md_file.stem + ".docx"
-            output_path_file = output_folder / docx_filename
-            
-            if convert_markdown_to_docx(md_file, output_path_file):
-                successful += 1
-                print(f"   ✅ Success!")
-            else:
-                failed += 1
-                print(f"   ❌ Failed")
+        try:
+            for event in convert_tree(folder_path, output_dir, markdown_files=markdown_files):
+                if event.kind == 'skipped':
+                    done += 1
+                    skipped += 1
+                    print(f"⚠️  Skipping {event.md_file.relative_to(folder_path)} - "
+                          f"{event.owner.relative_to(folder_path)} already becomes the same .docx file")
+                elif event.kind in ('converted', 'failed'):
+                    done += 1
+                    print(f"🔄 Converted file {done}/{len(markdown_files)}: {event.md_file.name}")
+                    if event.kind == 'converted':
+                        successful += 1
+                        print(f"   ✅ Success!")
+                    else:
+                        failed += 1
+                        print(f"   ❌ Failed: {event.error}")
+        except KeyboardInterrupt:
+            print()
+            print("⏹️  Conversion stopped - files that were already converted are kept")
         
         print()
         print("=" * 60)
@@ -161,6 +167,8 @@ def simple_user_interface():
         print(f"✅ Successfully converted: {successful} files")
         if failed > 0:
             print(f"❌ Failed: {failed} files")
+        if skipped > 0:
+            print(f"⚠️  Skipped (same .docx name as another file): {skipped} files")
         print(f"📁 Your converted files are in: {output_dir}")
         print("=" * 60)
         
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Native Writer
+
+A pure Python Markdown to WordprocessingML writer, ported from the browser
+version (parseMarkdownDirectly in netlify-version/converter.js and the
+templates in netlify-version/docx-structure.js).
+
+It only understands a small subset of markdown: ATX headings, flat bullet and
+numbered lists, single-level block quotes, fenced code blocks, horizontal
+rules and inline bold/italic/strikethrough/code. Use is_simple_markdown() to
+check whether a document stays inside that subset before writing it here;
+everything else should go through pandoc.
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import re
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+CONTENT_TYPES_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+    <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+    <Default Extension="xml" ContentType="application/xml"/>
+    <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+    <Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+    <Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>
+</Types>'''
+
+RELS_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+    <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>'''
+
+DOCUMENT_RELS_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+    <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+    <Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>
+</Relationships>'''
+
+HEADING_SPACING = {1: 240, 2: 200, 3: 160, 4: 140, 5: 120, 6: 120}
+HEADING_SIZE = {1: 32, 2: 26, 3: 24, 4: 22, 5: 22, 6: 22}
+
+STYLES_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+    <w:style w:type="paragraph" w:styleId="Normal">
+        <w:name w:val="Normal"/>
+        <w:qFormat/>
+        <w:pPr>
+            <w:spacing w:after="120"/>
+        </w:pPr>
+        <w:rPr>
+            <w:sz w:val="22"/>
+        </w:rPr>
+    </w:style>
+''' + ''.join(f'''    <w:style w:type="paragraph" w:styleId="Heading{level}">
+        <w:name w:val="heading {level}"/>
+        <w:basedOn w:val="Normal"/>
+        <w:pPr>
+            <w:spacing w:before="{HEADING_SPACING[level]}" w:after="120"/>
+            <w:outlineLvl w:val="{level - 1}"/>
+        </w:pPr>
+        <w:rPr>
+            <w:b/>
+            <w:sz w:val="{HEADING_SIZE[level]}"/>
+            <w:color w:val="2F5597"/>
+        </w:rPr>
+    </w:style>
+''' for level in range(1, 7)) + '''    <w:style w:type="paragraph" w:styleId="Quote">
+        <w:name w:val="Quote"/>
+        <w:basedOn w:val="Normal"/>
+        <w:pPr>
+            <w:spacing w:before="120" w:after="120"/>
+            <w:ind w:left="720"/>
+        </w:pPr>
+        <w:rPr>
+            <w:i/>
+            <w:color w:val="666666"/>
+        </w:rPr>
+    </w:style>
+    <w:style w:type="paragraph" w:styleId="Code">
+        <w:name w:val="Code"/>
+        <w:basedOn w:val="Normal"/>
+        <w:pPr>
+            <w:spacing w:before="0" w:after="0"/>
+            <w:ind w:left="360"/>
+        </w:pPr>
+        <w:rPr>
+            <w:rFonts w:ascii="Courier New" w:hAnsi="Courier New"/>
+            <w:sz w:val="18"/>
+            <w:shd w:val="clear" w:color="auto" w:fill="F5F5F5"/>
+        </w:rPr>
+    </w:style>
+</w:styles>'''
+
+# abstractNumId 0 is the numbered list, 1 the bullet list
+ABSTRACT_NUMBERING_XML = '''    <w:abstractNum w:abstractNumId="0">
+        <w:lvl w:ilvl="0">
+            <w:start w:val="1"/>
+            <w:numFmt w:val="decimal"/>
+            <w:lvlText w:val="%1."/>
+            <w:lvlJc w:val="left"/>
+            <w:pPr>
+                <w:ind w:left="720" w:hanging="360"/>
+            </w:pPr>
+        </w:lvl>
+    </w:abstractNum>
+    <w:abstractNum w:abstractNumId="1">
+        <w:lvl w:ilvl="0">
+            <w:start w:val="1"/>
+            <w:numFmt w:val="bullet"/>
+            <w:lvlText w:val="•"/>
+            <w:lvlJc w:val="left"/>
+            <w:pPr>
+                <w:ind w:left="720" w:hanging="360"/>
+            </w:pPr>
+        </w:lvl>
+    </w:abstractNum>
+'''
+
+BULLET_NUM_ID = 1
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+BULLET_RE = re.compile(r'^[-*+]\s+(.*)$')
+ORDERED_RE = re.compile(r'^(\d{1,9})[.)]\s+(.*)$')
+QUOTE_RE = re.compile(r'^>\s?(.*)$')
+HR_RE = re.compile(r'^(?:(?:-\s*){3,}|(?:\*\s*){3,}|(?:_\s*){3,})$')
+FENCE_RE = re.compile(r'^(`{3,}|~{3,})')
+
+# Same precedence as parseMarkdownSegments() in converter.js; emphasis may not
+# start or end with whitespace, as in pandoc
+INLINE_PATTERNS = [
+    (re.compile(r'\*\*\*(\S(?:.*?\S)?)\*\*\*'), {'bold': True, 'italic': True}),
+    (re.compile(r'\*\*(\S(?:.*?\S)?)\*\*'), {'bold': True}),
+    (re.compile(r'\*(\S(?:.*?\S)?)\*'), {'italic': True}),
+    (re.compile(r'~~(\S(?:.*?\S)?)~~'), {'strikethrough': True}),
+]
+CODE_SPAN_RE = re.compile(r'(`+)(.+?)\1')
+
+# Characters whose meaning in pandoc markdown goes beyond what this writer
+# handles: links, images, tables, raw HTML, escapes, math, footnotes,
+# underscore emphasis and quotes that pandoc would turn into curly quotes
+UNSUPPORTED_CHARS = re.compile(r'[\[\]<>|\\$_"@^{}]|&#?\w+;')
+# Letter and roman numeral lists, (1) style lists and definition lists
+FANCY_LIST_RE = re.compile(r'^(?:[a-zA-Z]|[ivxlcdmIVXLCDM]+)[.)]\s|^\(|^[:~]\s')
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _smarten(text):
+    """Apply pandoc's smart punctuation to plain text"""
+    text = text.replace('---', '—').replace('--', '–').replace('...', '…')
+    return re.sub(r"(?<=\w)'(?=\w)", '’', text)
+
+
+def _split_code_spans(text):
+    """Split text into (is_code, text) pieces"""
+    pieces = []
+    last_end = 0
+    for match in CODE_SPAN_RE.finditer(text):
+        if match.start() > last_end:
+            pieces.append((False, text[last_end:match.start()]))
+        pieces.append((True, match.group(2).strip() or match.group(2)))
+        last_end = match.end()
+    if last_end < len(text):
+        pieces.append((False, text[last_end:]))
+    return pieces
+
+
+def _emphasis_segments(text):
+    """Split plain text into (text, formatting) segments"""
+    matches = []
+    for regex, formatting in INLINE_PATTERNS:
+        for match in regex.finditer(text):
+            matches.append((match.start(), match.end(), match.group(1), formatting))
+    matches.sort(key=lambda m: m[0])
+
+    # Remove overlapping matches (keep the first one)
+    kept = []
+    for match in matches:
+        if not any(match[0] < other[1] and match[1] > other[0] for other in kept):
+            kept.append(match)
+
+    segments = []
+    last_end = 0
+    for start, end, inner, formatting in kept:
+        if start > last_end:
+            segments.append((text[last_end:start], {}))
+        segments.append((inner, formatting))
+        last_end = end
+    if last_end < len(text):
+        segments.append((text[last_end:], {}))
+    return segments
+
+
+def parse_inline(text):
+    """Parse inline markdown into (text, formatting) segments"""
+    segments = []
+    for is_code, piece in _split_code_spans(text):
+        if is_code:
+            segments.append((piece, {'code': True}))
+        else:
+            segments.extend((_smarten(t), f) for t, f in _emphasis_segments(piece))
+    return segments
+
+
+def _inline_is_simple(text):
+    """True if every emphasis marker in text is consumed by parse_inline()"""
+    for is_code, piece in _split_code_spans(text):
+        if is_code:
+            continue
+        if '`' in piece or UNSUPPORTED_CHARS.search(piece) or "'" in _smarten(piece):
+            return False
+        for segment, formatting in _emphasis_segments(piece):
+            if '*' in segment or '~' in segment:
+                return False
+    return True
+
+
+def is_simple_markdown(text):
+    """
+    Cheap pre-scan deciding whether text can be written by this module.
+
+    Returns False as soon as the document uses anything beyond headings,
+    flat lists, single-level quotes, fenced code and inline emphasis, or
+    any construct where this writer and pandoc would disagree.
+    """
+    if CONTROL_CHARS_RE.search(text):
+        return False
+    lines = text.split('\n')
+    if lines and (lines[0].strip() == '---' or lines[0].startswith('%')):
+        return False  # YAML or pandoc title block
+
+    fence = None
+    previous = 'blank'
+    # Bullet character or number delimiter of the current list; pandoc starts
+    # a new list when it changes, this writer would not
+    list_marker = None
+    for raw in lines:
+        line = raw.rstrip('\r')
+        if fence:
+            if line.strip().startswith(fence):
+                fence = None
+                previous = 'blank'
+            continue
+        if not line.strip():
+            previous = 'blank'
+            continue
+        if line[0] in ' \t' or line.endswith('  '):
+            return False  # Nested lists, indented code, hard line breaks
+
+        # Without a blank line before them, pandoc folds headings, quotes,
+        # fences and rules into a preceding paragraph, list item or quote
+        fence_match = FENCE_RE.match(line)
+        if fence_match:
+            if previous not in ('blank', 'heading'):
+                return False
+            fence = fence_match.group(1)
+            list_marker = None
+            continue
+        if HR_RE.match(line):
+            if previous not in ('blank', 'heading'):
+                return False  # Setext heading underline or lazy continuation
+            previous = 'blank'
+            list_marker = None
+            continue
+        if line.startswith('=') or FANCY_LIST_RE.match(line):
+            return False
+
+        heading = HEADING_RE.match(line)
+        bullet = BULLET_RE.match(line)
+        ordered = ORDERED_RE.match(line)
+        quote = QUOTE_RE.match(line)
+        if heading or quote:
+            if previous in ('paragraph', 'list') or (heading and previous == 'quote'):
+                return False
+            content = heading.group(2) if heading else quote.group(1)
+            if quote and (content.startswith('>') or BULLET_RE.match(content) or ORDERED_RE.match(content)
+                          or HEADING_RE.match(content) or FENCE_RE.match(content)):
+                return False
+            if quote and not content.strip():
+                return False  # A blank ">" line starts a second paragraph inside the quote
+            previous = 'heading' if heading else 'quote'
+            list_marker = None
+        elif bullet or ordered:
+            if previous in ('paragraph', 'quote'):
+                return False
+            marker = line[0] if bullet else line[len(ordered.group(1))]
+            if list_marker is not None and marker != list_marker:
+                return False
+            list_marker = marker
+            content = bullet.group(1) if bullet else ordered.group(2)
+            previous = 'list'
+        elif line.startswith('#'):
+            return False
+        else:
+            content = line
+            if previous not in ('blank', 'list'):
+                if previous == 'quote':
+                    return False  # Lazy block quote continuation
+                previous = 'paragraph'
+            elif previous == 'blank':
+                previous = 'paragraph'
+                list_marker = None
+        if not _inline_is_simple(content):
+            return False
+    return fence is None
+
+
+def parse_blocks(text):
+    """Split markdown into (kind, payload) blocks"""
+    blocks = []
+    lines = text.split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i].rstrip('\r')
+        stripped = line.strip()
+
+        if not stripped:
+            i += 1
+            continue
+
+        fence_match = FENCE_RE.match(stripped)
+        if fence_match:
+            fence = fence_match.group(1)
+            i += 1
+            code_lines = []
+            while i < len(lines) and not lines[i].strip().startswith(fence):
+                code_lines.append(lines[i].rstrip('\r'))
+                i += 1
+            blocks.append(('code', code_lines))
+            i += 1  # Skip the closing fence
+            continue
+
+        heading = HEADING_RE.match(stripped)
+        bullet = BULLET_RE.match(stripped)
+        ordered = ORDERED_RE.match(stripped)
+        quote = QUOTE_RE.match(stripped)
+
+        if HR_RE.match(stripped):
+            blocks.append(('hr', None))
+        elif heading:
+            blocks.append(('heading', (len(heading.group(1)), heading.group(2))))
+        elif quote:
+            quote_lines = [quote.group(1)]
+            while i + 1 < len(lines) and QUOTE_RE.match(lines[i + 1].strip()):
+                i += 1
+                quote_lines.append(QUOTE_RE.match(lines[i].strip()).group(1))
+            blocks.append(('quote', ' '.join(l for l in quote_lines if l)))
+        elif bullet or ordered:
+            items = [bullet.group(1) if bullet else ordered.group(2)]
+            start = int(ordered.group(1)) if ordered else None
+            item_re = BULLET_RE if bullet else ORDERED_RE
+            while i + 1 < len(lines):
+                following = lines[i + 1].strip()
+                if not following:
+                    # A blank line only continues the list if another item follows
+                    j = i + 1
+                    while j < len(lines) and not lines[j].strip():
+                        j += 1
+                    if j < len(lines) and item_re.match(lines[j].strip()):
+                        i = j - 1
+                        continue
+                    break
+                next_item = item_re.match(following)
+                if next_item:
+                    items.append(next_item.group(next_item.lastindex))
+                elif (BULLET_RE.match(following) or ORDERED_RE.match(following) or HEADING_RE.match(following)
+                      or QUOTE_RE.match(following) or FENCE_RE.match(following) or HR_RE.match(following)):
+                    break
+                else:
+                    items[-1] += ' ' + following  # Lazy continuation line
+                i += 1
+            blocks.append(('ordered' if ordered else 'bullet', (start, items)))
+        else:
+            paragraph = [stripped]
+            while i + 1 < len(lines):
+                following = lines[i + 1].strip()
+                if not following or FENCE_RE.match(following):
+                    break
+                paragraph.append(following)
+                i += 1
+            blocks.append(('paragraph', ' '.join(paragraph)))
+        i += 1
+    return blocks
+
+
+def create_run(text, formatting=None):
+    """Create a WordprocessingML run for a piece of text"""
+    if not text:
+        return ''
+    formatting = formatting or {}
+    rpr = ''
+    if formatting.get('bold'):
+        rpr += '<w:b/>'
+    if formatting.get('italic'):
+        rpr += '<w:i/>'
+    if formatting.get('strikethrough'):
+        rpr += '<w:strike/>'
+    if formatting.get('code'):
+        rpr += '<w:rFonts w:ascii="Courier New" w:hAnsi="Courier New"/>'
+        rpr += '<w:shd w:val="clear" w:color="auto" w:fill="F5F5F5"/>'
+    rpr_tag = f'<w:rPr>{rpr}</w:rPr>' if rpr else ''
+    return f'<w:r>{rpr_tag}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def inline_runs(text):
+    """Convert inline markdown to a sequence of runs"""
+    runs = ''.join(create_run(t, f) for t, f in parse_inline(text))
+    return runs or '<w:r><w:t></w:t></w:r>'
+
+
+def blocks_to_wordml(blocks):
+    """Convert parsed blocks to WordprocessingML body content and list numbering"""
+    body = []
+    # Each numbered list gets its own w:num so numbering restarts per list
+    ordered_lists = []
+
+    for kind, payload in blocks:
+        if kind == 'heading':
+            level, text = payload
+            body.append(f'<w:p><w:pPr><w:pStyle w:val="Heading{level}"/></w:pPr>{inline_runs(text)}</w:p>')
+        elif kind == 'quote':
+            body.append(f'<w:p><w:pPr><w:pStyle w:val="Quote"/></w:pPr>{inline_runs(payload)}</w:p>')
+        elif kind == 'hr':
+            body.append('<w:p><w:pPr><w:pBdr><w:bottom w:val="single" w:sz="6" w:space="1" w:color="auto"/></w:pBdr></w:pPr></w:p>')
+        elif kind == 'code':
+            for code_line in payload or ['']:
+                body.append(f'<w:p><w:pPr><w:pStyle w:val="Code"/></w:pPr>'
+                            f'<w:r><w:t xml:space="preserve">{escape(code_line)}</w:t></w:r></w:p>')
+        elif kind in ('bullet', 'ordered'):
+            start, items = payload
+            if kind == 'ordered':
+                ordered_lists.append(start)
+                num_id = BULLET_NUM_ID + len(ordered_lists)
+            else:
+                num_id = BULLET_NUM_ID
+            for item in items:
+                body.append(f'<w:p><w:pPr><w:numPr><w:ilvl w:val="0"/><w:numId w:val="{num_id}"/></w:numPr></w:pPr>'
+                            f'{inline_runs(item)}</w:p>')
+        else:
+            body.append(f'<w:p>{inline_runs(payload)}</w:p>')
+
+    return ''.join(body) or '<w:p><w:r><w:t></w:t></w:r></w:p>', ordered_lists
+
+
+def numbering_xml(ordered_lists):
+    """Build numbering.xml with one bullet list and one entry per numbered list"""
+    nums = [f'    <w:num w:numId="{BULLET_NUM_ID}"><w:abstractNumId w:val="1"/></w:num>\n']
+    for index, start in enumerate(ordered_lists, start=BULLET_NUM_ID + 1):
+        nums.append(f'    <w:num w:numId="{index}"><w:abstractNumId w:val="0"/>'
+                    f'<w:lvlOverride w:ilvl="0"><w:startOverride w:val="{start}"/></w:lvlOverride></w:num>\n')
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:numbering xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">\n'
+            + ABSTRACT_NUMBERING_XML + ''.join(nums) + '</w:numbering>')
+
+
+def document_xml(content):
+    """Wrap body content in a w:document"""
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{content}</w:body></w:document>')
+
+
+def write_docx(markdown_text, output_path):
+    """Write markdown_text to output_path as a DOCX file"""
+    content, ordered_lists = blocks_to_wordml(parse_blocks(markdown_text))
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        docx.writestr('_rels/.rels', RELS_XML)
+        docx.writestr('word/_rels/document.xml.rels', DOCUMENT_RELS_XML)
+        docx.writestr('word/document.xml', document_xml(content))
+        docx.writestr('word/styles.xml', STYLES_XML)
+        docx.writestr('word/numbering.xml', numbering_xml(ordered_lists))
+
+
+def convert_markdown_to_docx_native(md_file_path, output_path):
+    """Convert a single markdown file to docx without pandoc"""
+    try:
+        text = Path(md_file_path).read_text(encoding='utf-8')
+        write_docx(text, output_path)
+        return True
+    except Exception as e:
+        print(f"Error converting {md_file_path}: {str(e)}")
+        return False
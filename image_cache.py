@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Image Cache
+
+Documentation that shows the same full-resolution screenshots on hundreds of
+pages makes pandoc read and embed every original in every DOCX. ImageCache
+downscales and recompresses each distinct image once and stores the result
+under the SHA-256 of the original bytes and the size settings, so every
+later conversion (in this run or a later one) reuses it.
+
+prepare() fills a scratch folder that mirrors a document's relative image
+paths with the optimized copies. run_pandoc() puts that folder first on
+--resource-path, so pandoc embeds the small versions while anything that was
+not optimized (remote, absolute or SVG images) still resolves from the
+markdown file's own folder.
+
+Needs Pillow (pip install Pillow).
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import unquote
+
+from conversion_cache import DEFAULT_CACHE_DIR, clone_file
+
+DEFAULT_IMAGE_CACHE_DIR = DEFAULT_CACHE_DIR / 'images'
+# Longest side in pixels; about 250 DPI across a 6.5 inch wide page
+DEFAULT_MAX_IMAGE_SIZE = 1600
+DEFAULT_JPEG_QUALITY = 85
+
+# Formats Pillow can rewrite losslessly enough and Word displays
+OPTIMIZABLE_FORMATS = {'.png': 'PNG', '.jpg': 'JPEG', '.jpeg': 'JPEG'}
+
+# ![alt](path "title") and [label]: path definitions
+INLINE_IMAGE_RE = re.compile(r'!\[(?:[^\]\\]|\\.)*\]\(\s*(<[^>]+>|[^)\s]+)')
+DEFINITION_RE = re.compile(r'^ {0,3}\[[^\]]+\]:[ \t]*(<[^>]+>|\S+)', re.M)
+URL_SCHEME_RE = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+
+def image_references(text):
+    """Relative local paths of the images a markdown document may embed"""
+    references = []
+    for match in list(INLINE_IMAGE_RE.finditer(text)) + list(DEFINITION_RE.finditer(text)):
+        target = unquote(match.group(1).strip('<>'))
+        if URL_SCHEME_RE.match(target) or os.path.isabs(target):
+            continue
+        target = os.path.normpath(target)
+        # Paths that climb out of the document's folder cannot be mirrored
+        # inside the scratch folder; pandoc embeds the original instead
+        if target.startswith('..') or Path(target).suffix.lower() not in OPTIMIZABLE_FORMATS:
+            continue
+        if target not in references:
+            references.append(target)
+    return references
+
+
+class ImageCache:
+    """On-disk cache of downscaled images, keyed by the original's contents"""
+
+    def __init__(self, directory=DEFAULT_IMAGE_CACHE_DIR, max_size=DEFAULT_MAX_IMAGE_SIZE,
+                 quality=DEFAULT_JPEG_QUALITY):
+        import PIL  # Fail at startup rather than on the first image
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.quality = quality
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _key_for(self, data):
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps({'max_size': self.max_size, 'quality': self.quality}).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _shrink(self, data, image_format):
+        """Downscaled, recompressed image bytes, or None when that saves nothing"""
+        from PIL import Image, ImageOps
+        with Image.open(io.BytesIO(data)) as image:
+            info = image.info
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.max_size, self.max_size), Image.LANCZOS)
+            options = {'optimize': True}
+            if 'dpi' in info:
+                options['dpi'] = info['dpi']
+            if image_format == 'JPEG':
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                options['quality'] = self.quality
+            output = io.BytesIO()
+            image.save(output, image_format, **options)
+        shrunk = output.getvalue()
+        return shrunk if len(shrunk) < len(data) else None
+
+    def optimize(self, image_path):
+        """
+        Path of the optimized copy of image_path, or None to use the original.
+
+        Each distinct image is processed once; concurrent callers asking for
+        the same one wait for the first.
+        """
+        image_path = Path(image_path)
+        data = image_path.read_bytes()
+        key = self._key_for(data)
+        suffix = image_path.suffix.lower()
+        path = self.directory / key[:2] / f"{key}{suffix}"
+        skip_marker = path.with_suffix('.skip')
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if path.exists():
+                with self._lock:
+                    self.hits += 1
+                return path
+            if skip_marker.exists():
+                with self._lock:
+                    self.hits += 1
+                return None
+            with self._lock:
+                self.misses += 1
+
+            try:
+                shrunk = self._shrink(data, OPTIMIZABLE_FORMATS[suffix])
+            except (OSError, ValueError):
+                shrunk = None  # Not an image Pillow can read; pandoc gets the original
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if shrunk is None:
+                skip_marker.touch()
+                return None
+            # Write to a temporary name first so other processes never see a partial file
+            fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(shrunk)
+                os.replace(temp_name, path)
+            except OSError:
+                if os.path.exists(temp_name):
+                    os.unlink(temp_name)
+                raise
+            return path
+
+    def prepare(self, md_file_path, work_dir):
+        """
+        Copy optimized versions of md_file_path's images into work_dir at the
+        relative paths the markdown uses. Returns how many were placed.
+        """
+        md_file_path = Path(md_file_path)
+        text = md_file_path.read_text(encoding='utf-8', errors='replace')
+        placed = 0
+        for reference in image_references(text):
+            original = md_file_path.parent / reference
+            if not original.is_file():
+                continue
+            optimized = self.optimize(original)
+            if optimized is None:
+                continue
+            target = Path(work_dir) / reference
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(optimized, target)
+            except OSError:
+                clone_file(optimized, target)
+            placed += 1
+        return placed
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Async Web Interface
+
+The same web interface as markdown_converter_web.py (same page, same
+routes), served by an ASGI server instead of Flask's request threads.
+pandoc runs through asyncio subprocesses under a semaphore, so uploads
+that are waiting, progress streams and downloads do not each hold an OS
+thread, and one process can follow hundreds of them at once.
+
+Jobs, the janitor, /healthz, /metrics and /profile are shared with the
+Flask version, so both report the same way.
+
+Requires: pip install starlette python-multipart uvicorn
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import markdown_converter_web as web
+from markdown_to_docx_converter import PANDOC_ARGS
+from profiler import NULL_PROFILER, measure_pandoc_startup
+
+# Number of pandoc processes that may run at the same time
+DEFAULT_CONCURRENCY = os.cpu_count() or 1
+
+config = {
+    "max_file_size": web.DEFAULT_MAX_FILE_MB * 1024 * 1024,
+    "max_request_size": web.DEFAULT_MAX_REQUEST_MB * 1024 * 1024,
+    "api_timeout": web.DEFAULT_API_TIMEOUT,
+    "artifact_ttl": web.DEFAULT_ARTIFACT_TTL_MINUTES * 60,
+    "artifact_budget": web.DEFAULT_ARTIFACT_BUDGET_MB * 1024 * 1024,
+    "concurrency": DEFAULT_CONCURRENCY,
+    "api_concurrency": web.DEFAULT_API_CONCURRENCY,
+    "queue_depth": web.DEFAULT_QUEUE_DEPTH,
+    "jobs_per_client": web.DEFAULT_JOBS_PER_CLIENT,
+}
+# The asyncio limits below are made by create_limits() in lifespan(): before
+# Python 3.10 they bind to the event loop current when they are created,
+# which at import time is not the loop the server runs on
+pandoc_slots = None
+# Jobs converted at once; the rest wait in the queue like the Flask workers
+job_slots = None
+api_slots = None
+
+# Notified whenever a job makes progress, for clients following it live
+jobs_changed = None
+# Running conversions; asyncio only keeps weak references to tasks
+conversion_tasks = set()
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+REQUEST_TOO_LARGE = "the data value transmitted exceeds the capacity limit."
+
+
+def limit_body(request, limit):
+    """
+    The same request, but reading more than limit bytes of body raises
+    UploadTooLarge. Counts what actually arrives, so chunked uploads without
+    a Content-Length are held to the limit too.
+    """
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise UploadTooLarge(REQUEST_TOO_LARGE)
+        return message
+
+    return Request(request.scope, receive)
+
+
+async def read_body(request, limit):
+    """The whole request body, raising UploadTooLarge once it passes limit bytes"""
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise UploadTooLarge(REQUEST_TOO_LARGE)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+class UploadParser(MultiPartParser):
+    """Starlette's multipart parser, refusing a file as soon as it passes max_file_size"""
+
+    def __init__(self, headers, stream, max_file_size, **options):
+        super().__init__(headers, stream, **options)
+        self.max_file_size = max_file_size
+        self.file_size = 0
+
+    def on_part_begin(self):
+        super().on_part_begin()
+        self.file_size = 0
+
+    def on_part_data(self, data, start, end):
+        if self._current_part.file is not None:
+            self.file_size += end - start
+            if self.file_size > self.max_file_size:
+                raise UploadTooLarge(f"Each file may be at most {self.max_file_size // (1024 * 1024)} MB")
+        super().on_part_data(data, start, end)
+
+
+async def read_form(request):
+    """The upload form, parsed as it arrives so an oversized file stops the upload"""
+    if not request.headers.get('content-type', '').startswith('multipart/form-data'):
+        return await request.form()
+    parser = UploadParser(request.headers, request.stream(), config["max_file_size"], max_files=100000)
+    return await parser.parse()
+
+
+def configure(concurrency=DEFAULT_CONCURRENCY, api_concurrency=web.DEFAULT_API_CONCURRENCY, **options):
+    """Set the pandoc and /api/convert limits and any of the config values"""
+    config.update(options, concurrency=concurrency, api_concurrency=api_concurrency)
+
+
+def create_limits():
+    """Make the semaphores and the condition from config, on the running loop"""
+    global pandoc_slots, job_slots, api_slots, jobs_changed
+    pandoc_slots = asyncio.Semaphore(config["concurrency"])
+    job_slots = asyncio.Semaphore(config["concurrency"])
+    api_slots = asyncio.Semaphore(config["api_concurrency"])
+    jobs_changed = asyncio.Condition()
+
+
+def pandoc_command(output_path='-', input_path=None):
+    """pandoc arguments for a markdown to docx conversion (stdin/stdout by default)"""
+    import pypandoc
+    command = [pypandoc.get_pandoc_path(), '--from', 'markdown', '--to', 'docx',
+               '--output', str(output_path)] + PANDOC_ARGS
+    if input_path is not None:
+        command.append(str(input_path))
+    return command
+
+
+async def run_pandoc(command, stdin=None, timeout=None):
+    """Run pandoc once a slot is free; returns its stdout, raising on failure"""
+    async with pandoc_slots:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(stdin), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+    if process.returncode != 0:
+        error = stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(error or f"pandoc exited with status {process.returncode}")
+    return stdout
+
+
+async def add_event(job, event, **data):
+    """Record a progress event for the job and wake up everything following it"""
+    web.record_event(job, event, **data)
+    await notify_followers()
+
+
+async def notify_followers():
+    async with jobs_changed:
+        jobs_changed.notify_all()
+
+
+async def forget_job(job):
+    """Drop a job that never got started"""
+    web.forget_job(job)
+    await notify_followers()
+
+
+async def file_finished(job, file_info):
+    """Add a converted (or failed) file to the job's results"""
+    with web.jobs_lock:
+        job["files"].append(file_info)
+    web.files_total.inc(result="converted" if file_info["status"] == "success" else "failed")
+    await add_event(job, "succeeded" if file_info["status"] == "success" else "failed", file=file_info)
+
+
+async def index(request):
+    """Main page with upload interface"""
+    status, body, headers = web.page_response(request.headers.get('if-none-match'),
+                                              request.headers.get('accept-encoding'))
+    return Response(body, status_code=status, headers=headers)
+
+
+async def favicon(request):
+    """Handle favicon requests"""
+    return Response(status_code=204)
+
+
+async def save_upload(upload, path):
+    """Copy an uploaded file to path in the default executor, off the event loop"""
+    def copy():
+        upload.file.seek(0)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(upload.file, f, web.DOWNLOAD_CHUNK_SIZE)
+
+    await asyncio.get_event_loop().run_in_executor(None, copy)
+
+
+async def convert_files(request):
+    """Handle file conversion request"""
+    length = request.headers.get('content-length')
+    if length and length.isdigit() and int(length) > config["max_request_size"]:
+        return JSONResponse({"error": f"Upload too large: {REQUEST_TOO_LARGE}"}, status_code=413)
+
+    # Decide before reading the upload, so refused requests cost nothing
+    client = request.client.host if request.client else None
+    job, rejection = web.admit_job(client, config["concurrency"], config["queue_depth"], config["jobs_per_client"])
+    if rejection:
+        code, message, seconds = rejection
+        return JSONResponse({"error": message, "retry_after": seconds}, status_code=code,
+                            headers={"Retry-After": str(seconds)})
+
+    # The header may be missing or wrong; the body itself is counted too
+    request = limit_body(request, config["max_request_size"])
+    try:
+        form = await read_form(request)
+    except UploadTooLarge as e:
+        await forget_job(job)
+        return JSONResponse({"error": f"Upload too large: {e}"}, status_code=413)
+    except MultiPartException as e:
+        await forget_job(job)
+        return JSONResponse({"error": e.message}, status_code=400)
+    except Exception:
+        # A client hanging up mid-upload or a malformed body; the job never
+        # started, so it must not keep counting against the limits
+        await forget_job(job)
+        raise
+    upload_dir = None
+    file_data = []
+    try:
+        for upload in form.getlist('markdown_files'):
+            filename = getattr(upload, 'filename', None)
+            if not filename or filename.strip() == '' or not filename.endswith('.md'):
+                continue
+            if upload_dir is None:
+                upload_dir = tempfile.mkdtemp(prefix="md_converter_input_")
+            path = web.unique_upload_path(upload_dir, filename)
+            await save_upload(upload, path)
+            file_data.append({'filename': filename, 'path': path})
+    except Exception:
+        await forget_job(job)
+        if upload_dir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
+    finally:
+        await form.close()
+
+    if not file_data:
+        await forget_job(job)
+        if upload_dir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+        return JSONResponse({"error": "No valid markdown files selected"}, status_code=400)
+
+    # Accepted so the page works unchanged; pandoc always runs as an asyncio subprocess here
+    backend = form.get('backend', 'subprocess')
+    if backend not in ('subprocess', 'server'):
+        await forget_job(job)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return JSONResponse({"error": f"Unknown backend: {backend}"}, status_code=400)
+
+    job["input_dir"] = upload_dir
+    task = asyncio.create_task(process_conversion(file_data, job))
+    conversion_tasks.add(task)
+    task.add_done_callback(conversion_tasks.discard)
+
+    return JSONResponse(web.admission_report(job))
+
+
+async def process_conversion(file_data, job):
+    """Convert one job's uploaded files once a job slot is free"""
+    async with job_slots:
+        job["status"] = "processing"
+        job["started_at"] = time.time()
+        web.update_queue_positions()
+        await notify_followers()
+        await _run_conversion(file_data, job)
+
+
+async def _run_conversion(file_data, job):
+    """Body of process_conversion(), reporting progress into job"""
+    try:
+        job["message"] = "Checking dependencies..."
+        job["progress"] = 5
+        status = web.get_dependency_status()
+        if not status["ok"]:
+            job["status"] = "error"
+            job["message"] = f"Error: {status['error']}"
+            return
+
+        output_dir = tempfile.mkdtemp(prefix="md_converter_output_")
+        job["output_dir"] = output_dir
+
+        markdown_files = []
+        for file_info in file_data:
+            path = Path(file_info['path'])
+            if not path.exists() or path.stat().st_size == 0:
+                job["status"] = "error"
+                job["message"] = f"Failed to save file {file_info['filename']} - file is empty"
+                return
+            markdown_files.append(path)
+
+        job["message"] = f"Found {len(markdown_files)} markdown files"
+        job["progress"] = 20
+        job["profiler"] = web.new_profiler()
+        profiler = job["profiler"] or NULL_PROFILER
+
+        successful = 0
+        failed = 0
+        for i, md_file in enumerate(markdown_files):
+            if job["cancel"].is_set():
+                job["cancelled"] = True
+                break
+            job["progress"] = int(20 + (i / len(markdown_files)) * 80)  # 20% to 100%
+            job["message"] = f"Converting {md_file.name}..."
+            await add_event(job, "started", name=md_file.name)
+
+            docx_filename = md_file.stem + ".docx"
+            output_path = Path(output_dir) / docx_filename
+            try:
+                web.input_bytes_total.inc(md_file.stat().st_size)
+                started = time.perf_counter()
+                with profiler.file(md_file), profiler.pandoc(md_file):
+                    await run_pandoc(pandoc_command(output_path, md_file))
+                web.pandoc_seconds.observe(time.perf_counter() - started)
+                if output_path.exists() and output_path.stat().st_size > 0:
+                    successful += 1
+                    web.output_bytes_total.inc(output_path.stat().st_size)
+                    await file_finished(job, {"name": md_file.name, "status": "success", "output": docx_filename})
+                else:
+                    failed += 1
+                    await file_finished(job, {"name": md_file.name, "status": "failed", "output": None})
+            except Exception as e:
+                failed += 1
+                await file_finished(job, {"name": md_file.name, "status": "failed", "output": None})
+                print(f"Error converting {md_file.name}: {e}")
+
+        # Cleanup the uploads; converted files stay for the download stream
+        shutil.rmtree(job["input_dir"], ignore_errors=True)
+
+        if successful == 0:
+            job["status"] = "error"
+            job["message"] = "No files were successfully converted"
+            return
+
+        job["status"] = "completed"
+        job["progress"] = 100
+        job["message"] = f"Conversion complete! {successful} files converted successfully"
+        if failed > 0:
+            job["message"] += f", {failed} files failed"
+        if job.get("cancelled"):
+            job["message"] += " (cancelled, remaining files skipped)"
+
+    except Exception as e:
+        job["status"] = "error"
+        job["message"] = f"Error during conversion: {str(e)}"
+    finally:
+        job["artifact_bytes"] = sum(web.path_size(path) for path in web.job_artifacts(job) if os.path.exists(path))
+        job["finished_at"] = time.time()
+        if job.get("profiler") is not None:
+            job["profiler"].finish()
+        web.jobs_total.inc(status=job["status"])
+        duration = job["finished_at"] - job["started_at"]
+        web.job_seconds.observe(duration)
+        web.record_job_time(duration)
+        await add_event(job, "summary", status=job["status"], files=web.public_job(job)["files"])
+
+
+async def get_progress(request):
+    """Get conversion progress for one job"""
+    job = web.get_job(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    return JSONResponse(web.public_job(job))
+
+
+async def cancel_job(request):
+    """Stop starting new files for a job; the file being converted finishes"""
+    job = web.get_job(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    job["cancel"].set()
+    return JSONResponse({"message": "Cancelling", "status": job["status"]})
+
+
+async def get_profile(request):
+    """Per-stage timings and the slowest files of one job (with --profile)"""
+    body, code = web.profile_report(request.path_params['job_id'])
+    return JSONResponse(body, status_code=code)
+
+
+async def progress_events(job, start=0):
+    """Yield the job's events in SSE format, ending after the summary"""
+    sent = start
+    while True:
+        async with jobs_changed:
+            if sent >= len(job["events"]):
+                try:
+                    await asyncio.wait_for(jobs_changed.wait(), web.PROGRESS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    pass
+        ready = job["events"][sent:]
+        if not ready:
+            yield ": keepalive\n\n"
+            continue
+        for event, data in ready:
+            yield web.sse_message(sent, event, data)
+            sent += 1
+            if event == "summary":
+                return
+
+
+async def stream_progress(request):
+    """Push one job's progress events to the browser as Server-Sent Events"""
+    job = web.get_job(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    try:
+        start = int(request.headers.get('last-event-id', -1)) + 1
+    except ValueError:
+        start = 0
+    return StreamingResponse(progress_events(job, start), media_type='text/event-stream',
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def stream_zip(job):
+    """Yield a ZIP of the job's converted files, waiting for files still in progress"""
+    # Keep the janitor away from the job's files while they are being sent
+    with web.jobs_lock:
+        job["downloads"] = job.get("downloads", 0) + 1
+    try:
+        buffer = web.ZipStream()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+            sent = 0
+            while True:
+                async with jobs_changed:
+                    await jobs_changed.wait_for(lambda: sent < len(job["files"]) or web.job_finished(job))
+                ready = job["files"][sent:]
+                finished = web.job_finished(job)
+                sent += len(ready)
+
+                for file_info in ready:
+                    if file_info["status"] != "success":
+                        continue
+                    file_path = Path(job["output_dir"]) / file_info["output"]
+                    zinfo = zipfile.ZipInfo.from_file(file_path, file_info["output"])
+                    zinfo.compress_type = zipfile.ZIP_STORED
+                    with open(file_path, 'rb') as source, zipf.open(zinfo, 'w') as member:
+                        while True:
+                            chunk = source.read(web.DOWNLOAD_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            member.write(chunk)
+                            yield buffer.take()
+                    yield buffer.take()
+
+                if finished and sent == len(job["files"]):
+                    break
+        # Closing the archive writes the central directory
+        yield buffer.take()
+    finally:
+        with web.jobs_lock:
+            job["downloads"] -= 1
+
+
+async def download_results(request):
+    """Download one job's converted files as ZIP, streamed as they are converted"""
+    job = web.get_job(request.path_params['job_id'])
+    if job is None or (web.job_finished(job) and not any(
+            file_info["status"] == "success" for file_info in job["files"])):
+        return JSONResponse({"error": "No files available for download"}, status_code=404)
+
+    download_name = f"converted_docx_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(stream_zip(job), media_type='application/zip',
+                             headers={"Content-Disposition": f"attachment; filename={download_name}"})
+
+
+async def api_convert(request):
+    """Convert the markdown in the request body and answer with the DOCX"""
+    try:
+        markdown = await read_body(request, config["max_request_size"])
+    except UploadTooLarge as e:
+        return JSONResponse({"error": f"Upload too large: {e}"}, status_code=413)
+    if not markdown.strip():
+        return JSONResponse({"error": "Request body must contain markdown"}, status_code=400)
+
+    if api_slots.locked():
+        return JSONResponse({"error": "Too many conversions in progress, try again shortly"},
+                            status_code=503, headers={"Retry-After": "1"})
+    async with api_slots:
+        try:
+            web.input_bytes_total.inc(len(markdown))
+            started = time.perf_counter()
+            docx = await run_pandoc(pandoc_command(), stdin=markdown, timeout=config["api_timeout"])
+            web.pandoc_seconds.observe(time.perf_counter() - started)
+            web.files_total.inc(result="converted")
+            web.output_bytes_total.inc(len(docx))
+        except asyncio.TimeoutError:
+            web.files_total.inc(result="failed")
+            return JSONResponse({"error": f"Conversion took longer than {config['api_timeout']} seconds"},
+                                status_code=504)
+        except Exception as e:
+            web.files_total.inc(result="failed")
+            return JSONResponse({"error": f"Conversion failed: {str(e)}"}, status_code=422)
+
+    filename = web.download_filename(request.query_params.get('filename'))
+    return Response(docx, media_type=web.DOCX_MIMETYPE,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+async def healthz(request):
+    """Report whether conversions can run"""
+    body, code = web.health_report()
+    return JSONResponse(body, status_code=code)
+
+
+async def metrics_endpoint(request):
+    """Counters and histograms in the Prometheus text format"""
+    return Response(web.metrics.render(), headers={"Content-Type": web.Registry.CONTENT_TYPE})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Probe pandoc, create the limits and start the janitor before serving"""
+    create_limits()
+    await asyncio.get_event_loop().run_in_executor(None, web.get_dependency_status)
+    web.start_janitor(config["artifact_ttl"], config["artifact_budget"])
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/favicon.ico', favicon),
+        Route('/convert', convert_files, methods=['POST']),
+        Route('/progress/stream/{job_id}', stream_progress),
+        Route('/progress/{job_id}', get_progress),
+        Route('/profile/{job_id}', get_profile),
+        Route('/cancel/{job_id}', cancel_job, methods=['POST']),
+        Route('/download/{job_id}', download_results),
+        Route('/api/convert', api_convert, methods=['POST']),
+        Route('/healthz', healthz),
+        Route('/metrics', metrics_endpoint),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    """Run the async web application with uvicorn"""
+    parser = argparse.ArgumentParser(description="Markdown to DOCX web converter (asyncio)")
+    parser.add_argument('--host', default='0.0.0.0', help='Address to listen on (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Number of jobs, and so pandoc processes, to run at once (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--max-file-size', type=int, default=web.DEFAULT_MAX_FILE_MB,
+                        help=f'Largest accepted markdown file in MB (default: {web.DEFAULT_MAX_FILE_MB})')
+    parser.add_argument('--max-request-size', type=int, default=web.DEFAULT_MAX_REQUEST_MB,
+                        help=f'Largest accepted upload in MB, all files together (default: {web.DEFAULT_MAX_REQUEST_MB})')
+    parser.add_argument('--api-concurrency', type=int, default=web.DEFAULT_API_CONCURRENCY,
+                        help=f'Number of /api/convert requests converted at once (default: {web.DEFAULT_API_CONCURRENCY})')
+    parser.add_argument('--api-timeout', type=float, default=web.DEFAULT_API_TIMEOUT,
+                        help=f'Seconds an /api/convert conversion may take (default: {web.DEFAULT_API_TIMEOUT})')
+    parser.add_argument('--artifact-ttl', type=float, default=web.DEFAULT_ARTIFACT_TTL_MINUTES,
+                        help=f'Minutes to keep a finished job\'s files for download (default: {web.DEFAULT_ARTIFACT_TTL_MINUTES})')
+    parser.add_argument('--artifact-budget', type=int, default=web.DEFAULT_ARTIFACT_BUDGET_MB,
+                        help=f'MB of job files to keep before deleting the oldest (default: {web.DEFAULT_ARTIFACT_BUDGET_MB})')
+    parser.add_argument('--queue-depth', type=int, default=web.DEFAULT_QUEUE_DEPTH,
+                        help=f'Jobs that may wait for a slot before new ones are refused (default: {web.DEFAULT_QUEUE_DEPTH})')
+    parser.add_argument('--jobs-per-client', type=int, default=web.DEFAULT_JOBS_PER_CLIENT,
+                        help=f'Unfinished jobs allowed per client address (default: {web.DEFAULT_JOBS_PER_CLIENT})')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each stage of every job; see /profile/<job_id>')
+    args = parser.parse_args()
+
+    if args.queue_depth < 0 or args.jobs_per_client < 1:
+        parser.error("--queue-depth must be at least 0 and --jobs-per-client at least 1")
+    if args.concurrency < 1 or args.api_concurrency < 1:
+        parser.error("--concurrency and --api-concurrency must be at least 1")
+    configure(args.concurrency, args.api_concurrency,
+              max_file_size=args.max_file_size * 1024 * 1024,
+              max_request_size=args.max_request_size * 1024 * 1024,
+              api_timeout=args.api_timeout,
+              artifact_ttl=args.artifact_ttl * 60,
+              artifact_budget=args.artifact_budget * 1024 * 1024,
+              queue_depth=args.queue_depth,
+              jobs_per_client=args.jobs_per_client)
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ Missing dependency: uvicorn")
+        print("Please install with: pip install starlette python-multipart uvicorn")
+        return
+
+    status = web.get_dependency_status()
+    if status["ok"]:
+        print(f"✅ Dependencies check passed (pandoc {status['pandoc_version']})")
+    else:
+        print(f"❌ Missing dependency: {status['error']}")
+        return
+
+    if args.profile:
+        # Jobs get their profilers from the shared web.new_profiler()
+        web.app.config['PROFILE'] = True
+        web.app.config['PANDOC_STARTUP'] = measure_pandoc_startup()
+        print("⏱️  Profiling every job; see /profile/<job_id>")
+
+    print("🌐 Starting Markdown to DOCX Web Converter (asyncio)...")
+    print(f"📱 Open your browser and go to: http://localhost:{args.port}")
+    print("🛑 Press Ctrl+C to stop the server")
+    print()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
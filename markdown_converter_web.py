@@ -10,32 +10,417 @@ Features:
 - Real-time progress updates
 - Beautiful, modern interface
 - Works on any device with a web browser
+- Separate progress and downloads for every conversion job
+- A fixed pool of workers so the server load stays predictable
+- Uploads are streamed straight to disk with per-file and per-request limits
+- Downloads start streaming while the remaining files are still converting
+- Live progress pushed to the page with Server-Sent Events (polling still works)
+- POST /api/convert turns one markdown document into DOCX in a single request
+- Finished jobs are cleaned up after a while, and when their files use too much disk
+- /healthz and Prometheus-style /metrics endpoints for monitoring
+- A bounded job queue and per-client job limits, so overload is refused early
+- The page is built once in memory, pre-compressed and revalidated with ETags
+- POST /cancel/<job_id> stops a job from starting any more files
+- Optional per-stage profiling of every job (--profile, served from /profile/<job_id>)
 
 Author: Brennan Kenneth Brown
 License: MIT
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, Request, Response, request, jsonify, send_file, redirect, url_for, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+import gzip
+import hashlib
+import io
+import json
+import math
 import os
+import subprocess
 import sys
 import tempfile
 import zipfile
 import threading
 import time
+import uuid
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 from datetime import datetime
+from metrics import Registry
+from profiler import Profiler, DEFAULT_TOP, measure_pandoc_startup
+
+# Upload limits, enforced while the request body is being read
+DEFAULT_MAX_FILE_MB = 50
+DEFAULT_MAX_REQUEST_MB = 500
+
+class UploadFile(io.FileIO):
+    """A file an upload is streamed into, refusing to grow past a size limit"""
+    
+    def __init__(self, path, limit):
+        super().__init__(path, 'w+')
+        self.limit = limit
+        self.written = 0
+    
+    def write(self, data):
+        self.written += len(data)
+        if self.limit is not None and self.written > self.limit:
+            raise RequestEntityTooLarge(f"Each file may be at most {self.limit // (1024 * 1024)} MB")
+        return super().write(data)
+
+class UploadRequest(Request):
+    """Request that writes uploaded markdown files directly into a job folder"""
+    
+    upload_dir = None
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        limit = app.config.get('MAX_UPLOAD_FILE_SIZE')
+        if not filename or not filename.endswith('.md'):
+            # Not something we will convert - count it against the limit, keep nothing
+            return UploadFile(os.devnull, limit)
+        if self.upload_dir is None:
+            self.upload_dir = tempfile.mkdtemp(prefix="md_converter_input_")
+        return UploadFile(unique_upload_path(self.upload_dir, filename), limit)
+
+def unique_upload_path(upload_dir, filename):
+    """Where to save an uploaded file, keeping same-named uploads apart"""
+    # Ensure safe filename
+    safe_filename = filename.replace('/', '_').replace('\\', '_')
+    path = os.path.join(upload_dir, safe_filename)
+    counter = 1
+    while os.path.exists(path):
+        stem, ext = os.path.splitext(safe_filename)
+        path = os.path.join(upload_dir, f"{stem}_{counter}{ext}")
+        counter += 1
+    return path
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = 'markdown-converter-secret-key'
+app.config['MAX_CONTENT_LENGTH'] = DEFAULT_MAX_REQUEST_MB * 1024 * 1024
+app.config['MAX_UPLOAD_FILE_SIZE'] = DEFAULT_MAX_FILE_MB * 1024 * 1024
+
+# Number of conversion jobs that may run at the same time; each job converts
+# conversion_jobs() files at once, so together they keep every CPU busy
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="conversion")
+
+# Progress for every conversion job, keyed by job ID
+jobs = {}
+jobs_lock = threading.Lock()
+# Notified whenever a job makes progress, for clients following it live
+jobs_changed = threading.Condition(jobs_lock)
+
+# Size of the pieces converted files are copied into a download stream in
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Seconds between keep-alive comments on an idle progress stream
+PROGRESS_KEEPALIVE = 15
+
+# Limits for the synchronous /api/convert endpoint
+DEFAULT_API_CONCURRENCY = DEFAULT_WORKERS
+DEFAULT_API_TIMEOUT = 30
+api_slots = threading.BoundedSemaphore(DEFAULT_API_CONCURRENCY)
+app.config['API_TIMEOUT'] = DEFAULT_API_TIMEOUT
+
+# --profile: every job records where its time goes (see profiler.py); the
+# cost of starting pandoc is measured once at startup
+app.config['PROFILE'] = False
+app.config['PANDOC_STARTUP'] = None
+# Job keys sent with /progress; the rest (client address, temp folders,
+# internal state) stays on the server
+PUBLIC_JOB_KEYS = ("id", "status", "progress", "message", "files", "cancelled")
+
+def public_job(job):
+    """A copy of the job's public fields, safe to take while its worker updates it"""
+    with jobs_lock:
+        state = {key: job[key] for key in PUBLIC_JOB_KEYS if key in job}
+        state["files"] = list(state["files"])
+    return state
+
+def new_profiler():
+    """A Profiler for one job, or None when profiling is off"""
+    return Profiler(app.config['PANDOC_STARTUP']) if app.config['PROFILE'] else None
+
+def profile_report(job_id):
+    """Body and status code for /profile/<job_id>"""
+    job = get_job(job_id)
+    if job is None:
+        return {"error": "Unknown job"}, 404
+    if job.get("profiler") is None:
+        return {"error": "No profile for this job (start the server with --profile)"}, 404
+    return job["profiler"].report(DEFAULT_TOP), 200
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Whether pandoc is usable, probed once instead of on every job
+dependency_status = None
+dependency_lock = threading.Lock()
+
+def get_dependency_status():
+    """Check pypandoc and pandoc on first use; later calls return the cached result"""
+    global dependency_status
+    with dependency_lock:
+        if dependency_status is None:
+            status = {"ok": False, "pandoc_version": None, "error": None,
+                      "checked_at": datetime.now().isoformat(timespec='seconds')}
+            try:
+                import pypandoc
+                status["pandoc_version"] = pypandoc.get_pandoc_version()
+                status["ok"] = True
+            except ImportError:
+                status["error"] = "pypandoc not installed. Please install with: pip install pypandoc"
+            except OSError:
+                status["error"] = "pandoc not installed. Please install from https://pandoc.org/"
+            dependency_status = status
+        return dependency_status
+
+def count_jobs(status):
+    with jobs_lock:
+        return sum(1 for job in jobs.values() if job["status"] == status)
+
+# Monitoring, served from /metrics
+metrics = Registry()
+jobs_total = metrics.counter('markdown_converter_jobs_total', 'Finished conversion jobs', ['status'])
+files_total = metrics.counter('markdown_converter_files_total', 'Converted documents', ['result'])
+input_bytes_total = metrics.counter('markdown_converter_input_bytes_total', 'Markdown bytes received for conversion')
+output_bytes_total = metrics.counter('markdown_converter_output_bytes_total', 'DOCX bytes produced')
+pandoc_seconds = metrics.histogram('markdown_converter_pandoc_seconds', 'Time to convert one document')
+job_seconds = metrics.histogram('markdown_converter_job_seconds', 'Time from a job starting to finishing')
+reclaimed_bytes_total = metrics.counter('markdown_converter_reclaimed_bytes_total', 'Bytes of job files deleted by the janitor')
+metrics.gauge('markdown_converter_queue_depth', 'Jobs waiting for a free worker', lambda: count_jobs("queued"))
+metrics.gauge('markdown_converter_active_workers', 'Jobs being converted right now', lambda: count_jobs("processing"))
+
+worker_count = DEFAULT_WORKERS
+
+def conversion_jobs():
+    """Files one job converts at once, so all workers together keep every CPU busy"""
+    return max(1, (os.cpu_count() or 1) // worker_count)
+
+def configure_workers(workers):
+    """Replace the shared executor with one of the given size"""
+    global executor, worker_count
+    old_executor = executor
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="conversion")
+    worker_count = workers
+    old_executor.shutdown(wait=False)
+
+def new_job(client=None, message="Waiting for a free worker..."):
+    """A progress dict for a job that has not been registered yet"""
+    return {"id": uuid.uuid4().hex, "status": "queued", "progress": 0, "message": message,
+            "files": [], "output_dir": "", "events": [], "client": client, "cancel": threading.Event()}
+
+def create_job(client=None):
+    """Register a new conversion job and return its progress dict"""
+    job = new_job(client)
+    with jobs_lock:
+        jobs[job["id"]] = job
+    return job
+
+# Admission control: how many jobs may wait for a worker, and how many
+# unfinished jobs one client may have; beyond that /convert says "later"
+DEFAULT_QUEUE_DEPTH = 100
+DEFAULT_JOBS_PER_CLIENT = 4
+app.config['QUEUE_DEPTH'] = DEFAULT_QUEUE_DEPTH
+app.config['JOBS_PER_CLIENT'] = DEFAULT_JOBS_PER_CLIENT
+
+# Running average of job durations, for Retry-After estimates
+average_job_seconds = None
+
+def record_job_time(seconds):
+    global average_job_seconds
+    if average_job_seconds is None:
+        average_job_seconds = seconds
+    else:
+        average_job_seconds = 0.8 * average_job_seconds + 0.2 * seconds
+
+def retry_after(queued, workers):
+    """Seconds until a new job would likely get a worker, from recent throughput"""
+    per_job = average_job_seconds or 1
+    return max(1, math.ceil((queued + 1) * per_job / workers))
+
+def admit_job(client, workers, queue_depth, jobs_per_client):
+    """
+    Create a job for client unless the queue or the client's share is full.
+
+    Returns (job, None) when admitted, otherwise (None, (status code,
+    message, seconds to wait)) for a 503 or 429 response.
+    """
+    with jobs_lock:
+        unfinished = [job for job in jobs.values() if not job_finished(job)]
+        queued = sum(1 for job in unfinished if job["status"] == "queued")
+        own = sum(1 for job in unfinished if job["client"] == client)
+        if own >= jobs_per_client:
+            return None, (429, f"You already have {own} conversion{'s' if own != 1 else ''} in progress - "
+                               "please wait for one to finish", retry_after(queued, workers))
+        if queued >= queue_depth:
+            return None, (503, "The converter is busy - please try again shortly", retry_after(queued, workers))
+        job = new_job(client, f"Queued, position {queued + 1}")
+        jobs[job["id"]] = job
+    record_event(job, "queued", position=queued + 1)
+    return job, None
+
+def admission_report(job):
+    """The /convert reply for an admitted job: its ID, status and queue position"""
+    with jobs_lock:
+        report = {"message": job["message"], "status": job["status"], "job_id": job["id"]}
+        if job["status"] == "queued":
+            waiting = [other["id"] for other in jobs.values() if other["status"] == "queued"]
+            report["position"] = waiting.index(job["id"]) + 1
+    return report
+
+def forget_job(job):
+    """Drop a job that never got started"""
+    with jobs_lock:
+        jobs.pop(job["id"], None)
+    update_queue_positions()
+
+def update_queue_positions():
+    """Tell every waiting job where it now is in the queue"""
+    with jobs_lock:
+        waiting = [job for job in jobs.values() if job["status"] == "queued"]
+    for position, job in enumerate(waiting, 1):
+        message = f"Queued, position {position}"
+        if job["message"] != message:
+            job["message"] = message
+            record_event(job, "queued", position=position)
+    notify_followers()
+
+def get_job(job_id):
+    """Look up a job by ID, or None"""
+    with jobs_lock:
+        return jobs.get(job_id)
+
+def add_event(job, event, **data):
+    """Record a progress event for the job and wake up everything following it"""
+    record_event(job, event, **data)
+    notify_followers()
+
+def record_event(job, event, **data):
+    with jobs_lock:
+        data.update(progress=job["progress"], message=job["message"])
+        job["events"].append((event, data))
+
+def notify_followers():
+    with jobs_changed:
+        jobs_changed.notify_all()
+
+def file_finished(job, file_info):
+    """Add a converted (or failed) file to the job's results"""
+    # Shared with downloads that are already streaming, so only ever appended to
+    with jobs_lock:
+        job["files"].append(file_info)
+    files_total.inc(result="converted" if file_info["status"] == "success" else "failed")
+    add_event(job, "succeeded" if file_info["status"] == "success" else "failed", file=file_info)
+
+def job_finished(job):
+    return job["status"] in ("completed", "error")
+
+# Job artifacts (uploads and converted files) are kept this long after a job
+# finishes, and the oldest are deleted early when they outgrow the budget
+DEFAULT_ARTIFACT_TTL_MINUTES = 60
+DEFAULT_ARTIFACT_BUDGET_MB = 1024
+JANITOR_INTERVAL = 60
+# Temp folder entries created by this app, including ZIPs from older versions
+ARTIFACT_PREFIXES = ("md_converter_input_", "md_converter_output_", "converted_files_")
 
-# Global variables for progress tracking
-conversion_progress = {"status": "idle", "progress": 0, "message": "", "files": [], "output_path": ""}
+def path_size(path):
+    """Total size in bytes of a file or folder tree"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def remove_path(path):
+    """Delete a file or folder tree; returns the number of bytes freed"""
+    size = path_size(path)
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            return 0
+    return size
+
+def job_artifacts(job):
+    return [path for path in (job.get("input_dir"), job.get("output_dir")) if path]
+
+def expire_jobs(ttl, budget):
+    """Forget finished jobs older than ttl seconds, then the oldest ones until
+    their files fit in budget bytes; returns (jobs expired, bytes freed)"""
+    now = time.time()
+    with jobs_lock:
+        # Jobs still being downloaded are left alone until the download ends
+        finished = sorted((job for job in jobs.values() if "finished_at" in job and not job.get("downloads")),
+                          key=lambda job: job["finished_at"])
+        total = sum(job["artifact_bytes"] for job in finished)
+        expired = []
+        for job in finished:
+            if now - job["finished_at"] > ttl or total > budget:
+                expired.append(job)
+                total -= job["artifact_bytes"]
+                del jobs[job["id"]]
+    freed = sum(remove_path(path) for job in expired for path in job_artifacts(job) if os.path.exists(path))
+    return len(expired), freed
+
+def sweep_orphans(min_age):
+    """Delete leftovers in the temp folder that no known job owns, such as
+    those of a crashed or restarted server; returns the number of bytes freed
+    
+    Only entries untouched for min_age seconds are removed, so uploads still
+    being received (and other servers sharing the temp folder) are safe.
+    """
+    with jobs_lock:
+        owned = {os.path.normpath(path) for job in jobs.values() for path in job_artifacts(job)}
+    cutoff = time.time() - min_age
+    freed = 0
+    for entry in os.scandir(tempfile.gettempdir()):
+        if not entry.name.startswith(ARTIFACT_PREFIXES) or os.path.normpath(entry.path) in owned:
+            continue
+        try:
+            if entry.stat(follow_symlinks=False).st_mtime > cutoff:
+                continue
+        except OSError:
+            continue
+        freed += remove_path(entry.path)
+    return freed
+
+def collect_garbage(ttl, budget):
+    """One janitor pass; prints and returns the number of bytes reclaimed"""
+    expired, freed = expire_jobs(ttl, budget)
+    freed += sweep_orphans(ttl)
+    reclaimed_bytes_total.inc(freed)
+    if freed:
+        from conversion_cache import format_size
+        print(f"🧹 Reclaimed {format_size(freed)} ({expired} expired jobs)")
+    return freed
+
+def start_janitor(ttl, budget, interval=JANITOR_INTERVAL):
+    """Clean up once now, then keep cleaning up in a background thread"""
+    collect_garbage(ttl, budget)
+    
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                collect_garbage(ttl, budget)
+            except Exception as e:
+                print(f"Error cleaning up job files: {e}")
+    
+    threading.Thread(target=run, name="janitor", daemon=True).start()
 
 @app.route('/')
 def index():
     """Main page with upload interface"""
-    return render_template('index.html')
+    status, body, headers = page_response(request.headers.get('If-None-Match'),
+                                          request.headers.get('Accept-Encoding'))
+    return Response(body, status, headers)
 
 @app.route('/favicon.ico')
 def favicon():
@@ -45,76 +430,294 @@ def favicon():
 @app.route('/convert', methods=['POST'])
 def convert_files():
     """Handle file conversion request"""
-    global conversion_progress
+    # Decide before reading the upload, so refused requests cost nothing
+    job, rejection = admit_job(request.remote_addr, worker_count,
+                               app.config['QUEUE_DEPTH'], app.config['JOBS_PER_CLIENT'])
+    if rejection:
+        code, message, seconds = rejection
+        response = jsonify({"error": message, "retry_after": seconds})
+        response.headers["Retry-After"] = str(seconds)
+        return response, code
     
-    # Reset progress
-    conversion_progress = {"status": "starting", "progress": 0, "message": "Starting conversion...", "files": [], "output_path": ""}
-    
-    # Get uploaded files and read their content immediately
-    uploaded_files = request.files.getlist('markdown_files')
-    
-    # Read file contents in the main thread (before Flask closes the file objects)
-    file_data = []
-    for file in uploaded_files:
-        if file and file.filename and file.filename.strip() != '' and file.filename.endswith('.md'):
-            try:
-                # Read the file content immediately
-                content = file.read()
+    # Until the job is queued, any failure (a client hanging up mid-upload,
+    # a full disk) must drop it, or it would count against the limits forever
+    try:
+        # Parsing the form streams every markdown file into request.upload_dir
+        try:
+            uploaded_files = request.files.getlist('markdown_files')
+        except RequestEntityTooLarge as e:
+            discard_upload(job)
+            return jsonify({"error": f"Upload too large: {e.description}"}), 413
+        
+        # Only the paths are handed on - the contents are already on disk
+        file_data = []
+        for file in uploaded_files:
+            if file and file.filename and file.filename.strip() != '' and file.filename.endswith('.md'):
                 file_data.append({
                     'filename': file.filename,
-                    'content': content
+                    'path': file.stream.name
                 })
-            except Exception as e:
-                return jsonify({"error": f"Error reading file {file.filename}: {str(e)}"}), 400
+                file.close()
+        
+        if not file_data:
+            discard_upload(job)
+            return jsonify({"error": "No valid markdown files selected"}), 400
+        
+        backend = request.form.get('backend', 'subprocess')
+        if backend not in ('subprocess', 'server'):
+            discard_upload(job)
+            return jsonify({"error": f"Unknown backend: {backend}"}), 400
+        
+        # Queue the conversion on the shared worker pool with the saved file paths
+        job["input_dir"] = request.upload_dir
+        executor.submit(process_conversion, file_data, backend, job)
+    except Exception:
+        discard_upload(job)
+        raise
     
-    if not file_data:
-        return jsonify({"error": "No valid markdown files selected"}), 400
+    return jsonify(admission_report(job))
+
+@app.route('/api/convert', methods=['POST'])
+def api_convert():
+    """Convert the markdown in the request body and answer with the DOCX
     
-    # Start conversion in background thread with file data (not file objects)
-    thread = threading.Thread(target=process_conversion, args=(file_data,))
-    thread.daemon = True
-    thread.start()
+    Meant for one document at a time: pandoc reads the body from stdin and
+    writes the DOCX to stdout, so nothing touches the disk and there is no
+    job to poll. ?filename= sets the name the download is offered under.
+    """
+    markdown = request.get_data()
+    if not markdown.strip():
+        return jsonify({"error": "Request body must contain markdown"}), 400
     
-    return jsonify({"message": "Conversion started", "status": "processing"})
-
-@app.route('/progress')
-def get_progress():
-    """Get current conversion progress"""
-    return jsonify(conversion_progress)
-
-@app.route('/download')
-def download_results():
-    """Download converted files as ZIP"""
-    if conversion_progress.get("output_path") and os.path.exists(conversion_progress["output_path"]):
-        return send_file(conversion_progress["output_path"], as_attachment=True, 
-                        download_name=f"converted_docx_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
-    else:
+    if not api_slots.acquire(blocking=False):
+        response = jsonify({"error": "Too many conversions in progress, try again shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    try:
+        from markdown_to_docx_converter import pandoc_bytes
+        input_bytes_total.inc(len(markdown))
+        started = time.perf_counter()
+        docx = pandoc_bytes(markdown, timeout=app.config['API_TIMEOUT'])
+        pandoc_seconds.observe(time.perf_counter() - started)
+        files_total.inc(result="converted")
+        output_bytes_total.inc(len(docx))
+    except subprocess.TimeoutExpired:
+        files_total.inc(result="failed")
+        return jsonify({"error": f"Conversion took longer than {app.config['API_TIMEOUT']} seconds"}), 504
+    except Exception as e:
+        files_total.inc(result="failed")
+        return jsonify({"error": f"Conversion failed: {str(e)}"}), 422
+    finally:
+        api_slots.release()
+    
+    return send_file(io.BytesIO(docx), mimetype=DOCX_MIMETYPE, as_attachment=True,
+                     download_name=download_filename(request.args.get('filename')))
+
+def download_filename(name):
+    """The .docx name to offer for a ?filename= value, safe to put in a header"""
+    stem = secure_filename(Path(name or 'document.md').stem)
+    return (stem or 'document') + ".docx"
+
+def health_report():
+    """Body and status code for /healthz, from the cached dependency probe"""
+    status = get_dependency_status()
+    body = {"status": "ok" if status["ok"] else "unavailable", "pandoc_version": status["pandoc_version"],
+            "error": status["error"], "checked_at": status["checked_at"]}
+    return body, 200 if status["ok"] else 503
+
+@app.route('/healthz')
+def healthz():
+    """Report whether conversions can run"""
+    body, code = health_report()
+    return jsonify(body), code
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Counters and histograms in the Prometheus text format"""
+    return Response(metrics.render(), content_type=Registry.CONTENT_TYPE)
+
+def discard_upload(job):
+    """Delete whatever the current request streamed to disk, and its job"""
+    forget_job(job)
+    if request.upload_dir:
+        shutil.rmtree(request.upload_dir, ignore_errors=True)
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    """Reject oversized requests with a JSON error"""
+    return jsonify({"error": f"Upload too large: {e.description}"}), 413
+
+@app.route('/progress/<job_id>')
+def get_progress(job_id):
+    """Get conversion progress for one job"""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(public_job(job))
+
+@app.route('/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    """Stop starting new files for a job; files already converting finish"""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    job["cancel"].set()
+    return jsonify({"message": "Cancelling", "status": job["status"]})
+
+@app.route('/profile/<job_id>')
+def get_profile(job_id):
+    """Per-stage timings and the slowest files of one job (with --profile)"""
+    body, code = profile_report(job_id)
+    return jsonify(body), code
+
+@app.route('/progress/stream/<job_id>')
+def stream_progress(job_id):
+    """Push one job's progress events to the browser as Server-Sent Events"""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    
+    # A reconnecting EventSource resumes after the last event it saw
+    try:
+        start = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        start = 0
+    return Response(stream_with_context(progress_events(job, start)), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def sse_message(event_id, event, data):
+    """Format one Server-Sent Event"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+def progress_events(job, start=0):
+    """Yield the job's events in SSE format, ending after the summary"""
+    sent = start
+    while True:
+        with jobs_changed:
+            if sent >= len(job["events"]):
+                jobs_changed.wait(PROGRESS_KEEPALIVE)
+            ready = job["events"][sent:]
+        if not ready:
+            yield ": keepalive\n\n"
+            continue
+        for event, data in ready:
+            yield sse_message(sent, event, data)
+            sent += 1
+            if event == "summary":
+                return
+
+@app.route('/download/<job_id>')
+def download_results(job_id):
+    """Download one job's converted files as ZIP, streamed as they are converted"""
+    job = get_job(job_id)
+    if job is None or (job_finished(job) and not any(
+            file_info["status"] == "success" for file_info in job["files"])):
         return jsonify({"error": "No files available for download"}), 404
+    
+    download_name = f"converted_docx_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(stream_with_context(stream_zip(job)), mimetype='application/zip',
+                    headers={"Content-Disposition": f"attachment; filename={download_name}"})
+
+class ZipStream(io.RawIOBase):
+    """Write-only, unseekable buffer that a ZipFile writes into while it is being sent"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def take(self):
+        """Return and forget everything written so far"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
 
-def process_conversion(file_data):
-    """Process the uploaded file data and convert them"""
-    global conversion_progress
+def stream_zip(job):
+    """Yield a ZIP of the job's converted files, waiting for files still in progress
     
+    DOCX files are already deflate-compressed, so they are stored as-is
+    instead of being compressed a second time.
+    """
+    # Keep the janitor away from the job's files while they are being sent
+    with jobs_lock:
+        job["downloads"] = job.get("downloads", 0) + 1
     try:
-        # Check dependencies
+        yield from _stream_zip(job)
+    finally:
+        with jobs_lock:
+            job["downloads"] -= 1
+
+def _stream_zip(job):
+    buffer = ZipStream()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+        sent = 0
+        while True:
+            with jobs_changed:
+                while sent == len(job["files"]) and not job_finished(job):
+                    jobs_changed.wait()
+                ready = job["files"][sent:]
+                finished = job_finished(job)
+            sent += len(ready)
+            
+            for file_info in ready:
+                if file_info["status"] != "success":
+                    continue
+                file_path = Path(job["output_dir"]) / file_info["output"]
+                zinfo = zipfile.ZipInfo.from_file(file_path, file_info["output"])
+                zinfo.compress_type = zipfile.ZIP_STORED
+                with open(file_path, 'rb') as source, zipf.open(zinfo, 'w') as member:
+                    while True:
+                        chunk = source.read(DOWNLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        member.write(chunk)
+                        yield buffer.take()
+                yield buffer.take()
+            
+            if finished and sent == len(job["files"]):
+                break
+    # Closing the archive writes the central directory
+    yield buffer.take()
+
+def process_conversion(file_data, backend='subprocess', job=None):
+    """Process the uploaded file data and convert them
+
+    backend selects how pandoc is run: 'subprocess' starts a new pandoc
+    process per file, 'server' reuses a pool of persistent pandoc servers
+    and falls back to 'subprocess' when they are not available.
+
+    Progress is reported in job (a dict from create_job()); a new job is
+    created when none is given. Returns the job.
+    """
+    job = job if job is not None else create_job()
+    job["status"] = "processing"
+    job["started_at"] = time.time()
+    update_queue_positions()
+    _run_conversion(file_data, backend, job)
+    return job
+
+def _run_conversion(file_data, backend, conversion_progress):
+    """Body of process_conversion(), reporting into conversion_progress"""
+    try:
+        # Check dependencies (probed once, see get_dependency_status())
         conversion_progress["message"] = "Checking dependencies..."
         conversion_progress["progress"] = 5
         
-        try:
-            import pypandoc
-            pypandoc.get_pandoc_version()
-        except ImportError:
+        status = get_dependency_status()
+        if not status["ok"]:
             conversion_progress["status"] = "error"
-            conversion_progress["message"] = "Error: pypandoc not installed. Please install with: pip install pypandoc"
-            return
-        except OSError:
-            conversion_progress["status"] = "error"
-            conversion_progress["message"] = "Error: pandoc not installed. Please install from https://pandoc.org/"
+            conversion_progress["message"] = f"Error: {status['error']}"
             return
         
-        # Create temporary directories
-        temp_input_dir = tempfile.mkdtemp(prefix="md_converter_input_")
+        # Create temporary directories (uploads from /convert already have one)
+        temp_input_dir = conversion_progress.get("input_dir") or tempfile.mkdtemp(prefix="md_converter_input_")
         temp_output_dir = tempfile.mkdtemp(prefix="md_converter_output_")
+        conversion_progress["output_dir"] = temp_output_dir
         
         conversion_progress["message"] = "Processing uploaded files..."
         conversion_progress["progress"] = 10
@@ -123,16 +726,16 @@ def process_conversion(file_data):
         markdown_files = []
         for file_info in file_data:
             filename = file_info['filename']
-            content = file_info['content']
             
             # Ensure safe filename
             safe_filename = filename.replace('/', '_').replace('\\', '_')
-            file_path = os.path.join(temp_input_dir, safe_filename)
+            file_path = file_info.get('path') or os.path.join(temp_input_dir, safe_filename)
             
             try:
-                # Write content to disk
-                with open(file_path, 'wb') as f:
-                    f.write(content)
+                if 'path' not in file_info:
+                    # Write content to disk
+                    with open(file_path, 'wb') as f:
+                        f.write(file_info['content'])
                 
                 # Verify file was saved
                 if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
@@ -156,95 +759,81 @@ def process_conversion(file_data):
         conversion_progress["progress"] = 20
         
         # Import conversion functions
-        from markdown_to_docx_converter import convert_markdown_to_docx
+        from markdown_to_docx_converter import convert_batch, start_backend
+        
+        backend = start_backend(backend)
+        profiler = conversion_progress["profiler"] = new_profiler()
         
-        # Convert files
+        # Convert files through the shared engine, a few at a time
         successful = 0
         failed = 0
-        converted_files = []
-        
-        for i, md_file in enumerate(markdown_files):
-            progress = 20 + (i / len(markdown_files)) * 70  # 20% to 90%
-            conversion_progress["progress"] = int(progress)
-            conversion_progress["message"] = f"Converting {md_file.name}..."
-            
-            # Create output file path
-            docx_filename = md_file.stem + ".docx"
-            output_path = Path(temp_output_dir) / docx_filename
+        conversions = [(md_file, Path(temp_output_dir) / (md_file.stem + ".docx")) for md_file in markdown_files]
+        events = convert_batch(conversions, conversion_jobs(), conversion_progress["cancel"],
+                               backend=backend, profiler=profiler)
+        for event in events:
+            if event.kind == 'cancelled':
+                conversion_progress["cancelled"] = True
+                continue
+            md_file, output_path = event.md_file, event.output_path
+            if event.kind == 'started':
+                conversion_progress["message"] = f"Converting {md_file.name}..."
+                input_bytes_total.inc(md_file.stat().st_size)
+                add_event(conversion_progress, "started", name=md_file.name)
+                continue
             
-            try:
-                # Ensure the md_file exists and is readable
-                if not md_file.exists():
-                    failed += 1
-                    converted_files.append({"name": md_file.name, "status": "failed", "output": None})
-                    continue
-                
-                # Convert the file
-                if convert_markdown_to_docx(md_file, output_path):
-                    # Verify output file was created
-                    if output_path.exists() and output_path.stat().st_size > 0:
-                        successful += 1
-                        converted_files.append({"name": md_file.name, "status": "success", "output": docx_filename})
-                    else:
-                        failed += 1
-                        converted_files.append({"name": md_file.name, "status": "failed", "output": None})
-                else:
-                    failed += 1
-                    converted_files.append({"name": md_file.name, "status": "failed", "output": None})
-            except Exception as e:
+            pandoc_seconds.observe(event.seconds)
+            finished = successful + failed + 1
+            conversion_progress["progress"] = int(20 + (finished / len(conversions)) * 80)  # 20% to 100%
+            # Verify output file was created
+            if event.kind == 'converted' and output_path.exists() and output_path.stat().st_size > 0:
+                successful += 1
+                output_bytes_total.inc(output_path.stat().st_size)
+                file_finished(conversion_progress, {"name": md_file.name, "status": "success",
+                                                    "output": output_path.name})
+            else:
                 failed += 1
-                converted_files.append({"name": md_file.name, "status": "failed", "output": None})
-                print(f"Error converting {md_file.name}: {e}")  # For debugging
-        
-        conversion_progress["files"] = converted_files
-        conversion_progress["progress"] = 90
-        conversion_progress["message"] = "Creating download package..."
+                file_finished(conversion_progress, {"name": md_file.name, "status": "failed", "output": None})
+                if event.error:
+                    print(f"Error converting {md_file.name}: {event.error}")  # For debugging
         
-        # Create ZIP file with converted documents
-        zip_path = os.path.join(tempfile.gettempdir(), f"converted_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+        # Cleanup the uploads; converted files stay for the download stream
+        shutil.rmtree(temp_input_dir, ignore_errors=True)
         
-        try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                files_added = 0
-                for file_info in converted_files:
-                    if file_info["status"] == "success" and file_info["output"]:
-                        file_path = Path(temp_output_dir) / file_info["output"]
-                        if file_path.exists() and file_path.stat().st_size > 0:
-                            zipf.write(file_path, file_info["output"])
-                            files_added += 1
-                
-                if files_added == 0:
-                    conversion_progress["status"] = "error"
-                    conversion_progress["message"] = "No files were successfully converted"
-                    return
-                    
-        except Exception as e:
+        if successful == 0:
             conversion_progress["status"] = "error"
-            conversion_progress["message"] = f"Error creating download package: {str(e)}"
+            conversion_progress["message"] = "No files were successfully converted"
             return
         
-        # Cleanup temp directories
-        shutil.rmtree(temp_input_dir, ignore_errors=True)
-        shutil.rmtree(temp_output_dir, ignore_errors=True)
-        
         # Final status
         conversion_progress["status"] = "completed"
         conversion_progress["progress"] = 100
         conversion_progress["message"] = f"Conversion complete! {successful} files converted successfully"
-        conversion_progress["output_path"] = zip_path
         
         if failed > 0:
             conversion_progress["message"] += f", {failed} files failed"
+        if conversion_progress.get("cancelled"):
+            conversion_progress["message"] += " (cancelled, remaining files skipped)"
             
     except Exception as e:
         conversion_progress["status"] = "error"
         conversion_progress["message"] = f"Error during conversion: {str(e)}"
+    finally:
+        # What is left on disk now stays until the janitor expires the job
+        conversion_progress["artifact_bytes"] = sum(
+            path_size(path) for path in job_artifacts(conversion_progress) if os.path.exists(path))
+        conversion_progress["finished_at"] = time.time()
+        if conversion_progress.get("profiler") is not None:
+            conversion_progress["profiler"].finish()
+        jobs_total.inc(status=conversion_progress["status"])
+        if "started_at" in conversion_progress:
+            duration = conversion_progress["finished_at"] - conversion_progress["started_at"]
+            job_seconds.observe(duration)
+            record_job_time(duration)
+        add_event(conversion_progress, "summary", status=conversion_progress["status"],
+                  files=public_job(conversion_progress)["files"])
 
 def create_html_template():
-    """Create the HTML template for the web interface"""
-    template_dir = Path("templates")
-    template_dir.mkdir(exist_ok=True)
-    
+    """Create the HTML for the web interface"""
     html_content = '''
 <!DOCTYPE html>
 <html lang="en">
@@ -332,6 +921,12 @@ def create_html_template():
             display: none;
         }
         
+        .options {
+            text-align: center;
+            color: #666;
+            margin-bottom: 10px;
+        }
+        
         .btn {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
@@ -450,6 +1045,10 @@ def create_html_template():
             <input type="file" id="fileInput" name="markdown_files" multiple accept=".md" class="file-input">
         </form>
         
+        <div class="options">
+            <label><input type="checkbox" id="useServer"> Keep pandoc running between files (faster for many small files)</label>
+        </div>
+        
         <div style="text-align: center;">
             <button id="convertBtn" class="btn" onclick="startConversion()" disabled>Convert Files</button>
             <button class="btn" onclick="resetForm()">Reset</button>
@@ -474,6 +1073,7 @@ def create_html_template():
 
     <script>
         let selectedFiles = [];
+        let currentJobId = null;
         
         // File input change handler
         document.getElementById('fileInput').addEventListener('change', function(e) {
@@ -524,6 +1124,7 @@ def create_html_template():
             selectedFiles.forEach(file => {
                 formData.append('markdown_files', file);
             });
+            formData.append('backend', document.getElementById('useServer').checked ? 'server' : 'subprocess');
             
             document.getElementById('progressContainer').style.display = 'block';
             document.getElementById('convertBtn').disabled = true;
@@ -535,10 +1136,15 @@ def create_html_template():
             .then(response => response.json())
             .then(data => {
                 if (data.error) {
-                    alert('Error: ' + data.error);
+                    let message = 'Error: ' + data.error;
+                    if (data.retry_after) {
+                        message += ' (try again in about ' + data.retry_after + ' seconds)';
+                    }
+                    alert(message);
                     resetProgress();
                 } else {
-                    checkProgress();
+                    currentJobId = data.job_id;
+                    followProgress();
                 }
             })
             .catch(error => {
@@ -547,12 +1153,64 @@ def create_html_template():
             });
         }
         
+        function followProgress() {
+            // Browsers without Server-Sent Events poll instead
+            if (!window.EventSource) {
+                checkProgress();
+                return;
+            }
+            
+            const source = new EventSource('/progress/stream/' + currentJobId);
+            
+            source.addEventListener('queued', function(e) {
+                updateProgress(JSON.parse(e.data));
+            });
+            
+            source.addEventListener('started', function(e) {
+                updateProgress(JSON.parse(e.data));
+            });
+            
+            function fileFinished(e) {
+                const data = JSON.parse(e.data);
+                updateProgress(data);
+                if (data.file.status === 'success') {
+                    // The download streams files while the rest are still converting
+                    document.getElementById('downloadSection').style.display = 'block';
+                }
+            }
+            source.addEventListener('succeeded', fileFinished);
+            source.addEventListener('failed', fileFinished);
+            
+            source.addEventListener('summary', function(e) {
+                source.close();
+                const data = JSON.parse(e.data);
+                updateProgress(data);
+                if (data.status === 'completed') {
+                    showResults(data);
+                } else {
+                    alert('Error: ' + data.message);
+                    resetProgress();
+                }
+            });
+            
+            source.onerror = function() {
+                // Lost the stream (e.g. a proxy that buffers it) - fall back to polling
+                source.close();
+                checkProgress();
+            };
+        }
+        
         function checkProgress() {
-            fetch('/progress')
+            fetch('/progress/' + currentJobId)
             .then(response => response.json())
             .then(data => {
                 updateProgress(data);
                 
+                if (data.files.some(file => file.status === 'success')) {
+                    // The download streams files while the rest are still converting
+                    document.getElementById('downloadSection').style.display = 'block';
+                }
+                
                 if (data.status === 'completed') {
                     showResults(data);
                 } else if (data.status === 'error') {
@@ -590,7 +1248,7 @@ def create_html_template():
         }
         
         function downloadFiles() {
-            window.location.href = '/download';
+            window.location.href = '/download/' + currentJobId;
         }
         
         function resetForm() {
@@ -616,38 +1274,109 @@ def create_html_template():
 </body>
 </html>
     '''
+    return html_content
+
+def build_page(html):
+    """Encode, compress and fingerprint a page once, so requests only pick a variant"""
+    body = html.encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return {"body": body, "gzip": gzip.compress(body, 9),
+            "etag": f'"{digest}"', "gzip_etag": f'"{digest}-gz"'}
+
+# The main page, ready to send
+page = build_page(create_html_template())
+
+def page_response(if_none_match=None, accept_encoding=None):
+    """Status, body and headers for the main page
     
-    with open(template_dir / "index.html", "w") as f:
-        f.write(html_content)
+    Browsers revalidate on every visit (no-cache) and get a 304 while the
+    page is unchanged; clients that accept gzip get the compressed copy.
+    """
+    use_gzip = 'gzip' in (accept_encoding or '') and 'gzip;q=0' not in (accept_encoding or '').replace(' ', '')
+    etag = page["gzip_etag"] if use_gzip else page["etag"]
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        # Weak validators match too (str.removeprefix needs Python 3.9)
+        tags = {tag[2:] if tag.startswith('W/') else tag for tag in tags}
+        if '*' in tags or page["etag"] in tags or page["gzip_etag"] in tags:
+            return 304, b'', headers
+    
+    headers["Content-Type"] = "text/html; charset=utf-8"
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return 200, page["gzip"], headers
+    return 200, page["body"], headers
 
 def main():
     """Run the web application"""
+    parser = argparse.ArgumentParser(description="Markdown to DOCX web converter")
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of conversion jobs to run at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--max-file-size', type=int, default=DEFAULT_MAX_FILE_MB,
+                        help=f'Largest accepted markdown file in MB (default: {DEFAULT_MAX_FILE_MB})')
+    parser.add_argument('--max-request-size', type=int, default=DEFAULT_MAX_REQUEST_MB,
+                        help=f'Largest accepted upload in MB, all files together (default: {DEFAULT_MAX_REQUEST_MB})')
+    parser.add_argument('--api-concurrency', type=int, default=DEFAULT_API_CONCURRENCY,
+                        help=f'Number of /api/convert requests converted at once (default: {DEFAULT_API_CONCURRENCY})')
+    parser.add_argument('--api-timeout', type=float, default=DEFAULT_API_TIMEOUT,
+                        help=f'Seconds an /api/convert conversion may take (default: {DEFAULT_API_TIMEOUT})')
+    parser.add_argument('--artifact-ttl', type=float, default=DEFAULT_ARTIFACT_TTL_MINUTES,
+                        help=f'Minutes to keep a finished job\'s files for download (default: {DEFAULT_ARTIFACT_TTL_MINUTES})')
+    parser.add_argument('--artifact-budget', type=int, default=DEFAULT_ARTIFACT_BUDGET_MB,
+                        help=f'MB of job files to keep before deleting the oldest (default: {DEFAULT_ARTIFACT_BUDGET_MB})')
+    parser.add_argument('--queue-depth', type=int, default=DEFAULT_QUEUE_DEPTH,
+                        help=f'Jobs that may wait for a worker before new ones are refused (default: {DEFAULT_QUEUE_DEPTH})')
+    parser.add_argument('--jobs-per-client', type=int, default=DEFAULT_JOBS_PER_CLIENT,
+                        help=f'Unfinished jobs allowed per client address (default: {DEFAULT_JOBS_PER_CLIENT})')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each stage of every job; see /profile/<job_id>')
+    args = parser.parse_args()
+    
+    if args.queue_depth < 0 or args.jobs_per_client < 1:
+        parser.error("--queue-depth must be at least 0 and --jobs-per-client at least 1")
+    app.config['QUEUE_DEPTH'] = args.queue_depth
+    app.config['JOBS_PER_CLIENT'] = args.jobs_per_client
+    
+    global api_slots
+    if args.api_concurrency < 1:
+        parser.error("--api-concurrency must be at least 1")
+    api_slots = threading.BoundedSemaphore(args.api_concurrency)
+    app.config['API_TIMEOUT'] = args.api_timeout
+    app.config['MAX_UPLOAD_FILE_SIZE'] = args.max_file_size * 1024 * 1024
+    app.config['MAX_CONTENT_LENGTH'] = args.max_request_size * 1024 * 1024
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    configure_workers(args.workers)
+    
     print("🌐 Starting Markdown to DOCX Web Converter...")
     
-    # Check dependencies
-    try:
-        import pypandoc
-        pypandoc.get_pandoc_version()
-        print("✅ Dependencies check passed")
-    except ImportError:
-        print("❌ Missing dependency: pypandoc")
-        print("Please install with: pip install pypandoc")
-        return
-    except OSError:
-        print("❌ Missing dependency: pandoc")
-        print("Please install from: https://pandoc.org/installing.html")
+    # Check dependencies once; jobs and /healthz reuse the result
+    status = get_dependency_status()
+    if status["ok"]:
+        print(f"✅ Dependencies check passed (pandoc {status['pandoc_version']})")
+    else:
+        print(f"❌ Missing dependency: {status['error']}")
         return
     
-    # Create HTML template
-    create_html_template()
+    if args.profile:
+        app.config['PROFILE'] = True
+        app.config['PANDOC_STARTUP'] = measure_pandoc_startup()
+        print("⏱️  Profiling every job; see /profile/<job_id>")
+    
+    # Clean up what earlier runs left behind, then keep cleaning up
+    start_janitor(args.artifact_ttl * 60, args.artifact_budget * 1024 * 1024)
     
     print("🚀 Starting web server...")
-    print("📱 Open your browser and go to: http://localhost:8080")
+    print(f"📱 Open your browser and go to: http://localhost:{args.port}")
     print("🛑 Press Ctrl+C to stop the server")
     print()
     
     try:
-        app.run(host='0.0.0.0', port=8080, debug=False)
+        app.run(host='0.0.0.0', port=args.port, debug=False, threaded=True)
     except KeyboardInterrupt:
         print("\n👋 Server stopped. Goodbye!")
 
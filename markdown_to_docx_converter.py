@@ -2,7 +2,7 @@
 """
 Markdown to DOCX Converter
 
-A Python script that converts all markdown (.md) files in a specified directory
+A Python script that converts all markdown (.md, .markdown, .mdown) files in a specified directory
 and its subdirectories to Microsoft Word (.docx) format while preserving the
 original folder structure.
 
@@ -12,6 +12,15 @@ Features:
 - Timestamped output directories to avoid overwrites
 - Detailed progress reporting
 - Error handling with graceful continuation
+- Parallel conversion across all CPU cores
+- Optional persistent pandoc server backend for large batches of small files
+- Optional in-process fast path for simple documents (see docx_writer.py)
+- Optional persistent cache so unchanged files are never converted twice
+- Incremental mirror mode that only converts new or changed files
+- Watch mode that reconverts files as soon as they are saved
+- Optional downscaled, deduplicated image cache for screenshot-heavy documents
+- Optional per-stage profiling with a JSON report (--profile)
+- Merge mode that writes one DOCX per tree or per folder in a single pandoc run
 
 Author: Brennan Kenneth Brown
 License: MIT
@@ -19,47 +28,667 @@ Repository: https://github.com/[your-username]/markdown-to-docx-converter
 """
 
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import argparse
+import fnmatch
+import hashlib
+import json
+import queue
+import re
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pypandoc
 from datetime import datetime
+from conversion_cache import ConversionCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB, format_size
+from image_cache import DEFAULT_MAX_IMAGE_SIZE
+from profiler import NULL_PROFILER, DEFAULT_TOP
 
-def setup_output_directory(source_dir, output_base=None):
+DEFAULT_PROFILE_PATH = 'profile.json'
+
+def setup_output_directory(source_dir, output_base=None, create=True):
     """Create output directory structure"""
     if output_base:
         output_dir = Path(output_base)
     else:
         output_dir = source_dir.parent / f"{source_dir.name}_DOCX_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if create:
+        output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
-def convert_markdown_to_docx(md_file_path, output_path):
+# Arguments passed to every pandoc conversion
+PANDOC_ARGS = ['--standalone']
+
+# How run_pandoc() reaches pandoc: a new process per file, or a pool of
+# long-lived `pandoc server` processes (see pandoc_server.py)
+BACKENDS = ('subprocess', 'server')
+DEFAULT_SERVERS = 2
+
+def start_backend(backend, servers=DEFAULT_SERVERS):
+    """Prepare the requested backend and return the one that will actually be used"""
+    if backend == 'server':
+        from pandoc_server import get_server_pool
+        if get_server_pool(servers).available:
+            return 'server'
+        print("Warning: could not start pandoc server, falling back to subprocess backend")
+    return 'subprocess'
+
+def run_pandoc(md_file_path, output_path, backend='subprocess', resource_path=None):
+    """Convert a single markdown file to docx, raising on failure
+
+    Images are looked up next to the markdown file and then in the working
+    directory, unless resource_path (a folder, or several joined with
+    os.pathsep) says otherwise, e.g. for a chunk written to a temporary
+    folder or for optimized copies from an ImageCache.
+    """
+    if backend == 'server':
+        from pandoc_server import get_server_pool, PandocServerUnavailable
+        try:
+            get_server_pool().convert(md_file_path, output_path)
+            return
+        except PandocServerUnavailable:
+            pass  # Fall back to a regular pandoc process below
+    
+    if resource_path is None:
+        resource_path = os.pathsep.join([str(Path(md_file_path).resolve().parent), '.'])
+    
+    # Use pypandoc to convert markdown to docx
+    pypandoc.convert_file(
+        str(md_file_path), 
+        'docx', 
+        format='markdown',
+        outputfile=str(output_path),
+        extra_args=PANDOC_ARGS + [f'--resource-path={resource_path}']
+    )
+
+def pandoc_bytes(markdown, timeout=None):
+    """Convert markdown bytes to docx bytes through pandoc's stdin and stdout, raising on failure"""
+    command = [pypandoc.get_pandoc_path(), '--from', 'markdown', '--to', 'docx', '--output', '-'] + PANDOC_ARGS
+    # subprocess.run() kills pandoc and raises TimeoutExpired when timeout passes
+    result = subprocess.run(command, input=markdown, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            timeout=timeout)
+    if result.returncode != 0:
+        error = result.stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(error or f"pandoc exited with status {result.returncode}")
+    return result.stdout
+
+# Files larger than this are split at their headings, converted in parallel
+# pieces and merged again (see split_merge.py); 0 turns splitting off
+DEFAULT_SPLIT_THRESHOLD_MB = 8
+
+def convert_in_chunks(md_file_path, output_path, backend='subprocess', jobs=None, resource_path=None,
+                      executor=None):
+    """
+    Convert a very large markdown file as several smaller pandoc runs.
+
+    The pieces run on executor when given (convert_batch() shares one pool
+    between all the files of a batch, so -j bounds the pandoc processes of
+    every split file together), otherwise on a pool of jobs threads.
+
+    Returns False, without converting anything, when the file has no
+    headings to split at.
+    """
+    from split_merge import split_markdown, merge_docx
+    
+    md_file_path = Path(md_file_path)
+    chunks = split_markdown(md_file_path.read_text(encoding='utf-8'))
+    if len(chunks) < 2:
+        return False
+    
+    work_dir = tempfile.mkdtemp(prefix='md_to_docx_chunks_')
+    try:
+        pieces = []
+        for number, chunk in enumerate(chunks):
+            chunk_path = Path(work_dir) / f"chunk{number:05d}.md"
+            chunk_path.write_text(chunk, encoding='utf-8')
+            pieces.append((chunk_path, chunk_path.with_suffix('.docx')))
+        
+        # Relative image paths still point next to the original file
+        resource_path = resource_path or str(md_file_path.resolve().parent)
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=jobs or default_jobs())
+        try:
+            futures = [executor.submit(run_pandoc, chunk_path, docx_path, backend, resource_path)
+                       for chunk_path, docx_path in pieces]
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
+        
+        merge_docx([docx_path for _, docx_path in pieces], output_path)
+        return True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def _pandoc_convert(md_file_path, output_path, backend, split, resource_path, profiler, split_executor):
+    """Convert in pieces when split is set and the file has headings, otherwise in one pandoc run"""
+    if split:
+        with profiler.stage('split', md_file_path):
+            if convert_in_chunks(md_file_path, output_path, backend, resource_path=resource_path,
+                                 executor=split_executor):
+                return
+    # A pandoc server is already running, so only a new process pays for startup
+    with profiler.pandoc(md_file_path, startup=backend == 'subprocess'):
+        run_pandoc(md_file_path, output_path, backend, resource_path)
+
+def convert_document(md_file_path, output_path, backend='subprocess', fast_path=False, cache=None,
+                     split_threshold=DEFAULT_SPLIT_THRESHOLD_MB * 1024 * 1024, images=None, profiler=None,
+                     split_executor=None):
+    """
+    Convert a single markdown file to docx, raising on failure.
+
+    With fast_path, documents that only use headings, lists, quotes, code
+    and inline emphasis are written in-process by docx_writer; everything
+    else still goes through pandoc.
+
+    Files over split_threshold bytes that pandoc would convert are split at
+    their headings and converted piece by piece (see convert_in_chunks()),
+    on split_executor if given.
+
+    With a ConversionCache, a file whose contents were converted before with
+    the same options is copied from the cache instead. Documents with images
+    bypass the cache because the images themselves are not part of the key.
+
+    With an ImageCache (see image_cache.py), pandoc embeds downscaled copies
+    of the document's local images instead of the originals.
+
+    With a Profiler (see profiler.py), the time spent in each stage is
+    recorded for this file.
+    """
+    profiler = profiler or NULL_PROFILER
+    with profiler.file(md_file_path):
+        _convert_document(md_file_path, output_path, backend, fast_path, cache, split_threshold, images, profiler,
+                          split_executor)
+
+def _convert_document(md_file_path, output_path, backend, fast_path, cache, split_threshold, images, profiler,
+                      split_executor):
+    """Body of convert_document()"""
+    split = bool(split_threshold) and os.path.getsize(md_file_path) > split_threshold
+    cache_key = None
+    if cache is not None:
+        data = Path(md_file_path).read_bytes()
+        if b'![' not in data:
+            key_options = {'args': PANDOC_ARGS, 'fast_path': fast_path}
+            if split:
+                key_options['split'] = True
+            with profiler.stage('cache', md_file_path):
+                cache_key = cache.key_for(data, key_options)
+                if cache.get(cache_key, output_path):
+                    return
+    
+    image_dir = None
+    resource_path = None
+    if images is not None and b'![' in Path(md_file_path).read_bytes():
+        with profiler.stage('images', md_file_path):
+            image_dir = tempfile.mkdtemp(prefix='md_to_docx_images_')
+            if images.prepare(md_file_path, image_dir):
+                # Optimized copies first; everything else from the usual places
+                resource_path = os.pathsep.join([image_dir, str(Path(md_file_path).resolve().parent), '.'])
+    
+    try:
+        if fast_path:
+            from docx_writer import is_simple_markdown, write_docx
+            try:
+                text = Path(md_file_path).read_text(encoding='utf-8')
+            except UnicodeDecodeError:
+                text = None  # Let pandoc report the encoding problem
+            if text is not None and is_simple_markdown(text):
+                with profiler.stage('fast_path', md_file_path):
+                    write_docx(text, output_path)
+            else:
+                _pandoc_convert(md_file_path, output_path, backend, split, resource_path, profiler, split_executor)
+        else:
+            _pandoc_convert(md_file_path, output_path, backend, split, resource_path, profiler, split_executor)
+    finally:
+        if image_dir is not None:
+            shutil.rmtree(image_dir, ignore_errors=True)
+    
+    if cache_key is not None:
+        with profiler.stage('cache', md_file_path):
+            cache.put(cache_key, output_path)
+
+def convert_markdown_to_docx(md_file_path, output_path, backend='subprocess', fast_path=False, cache=None,
+                             profiler=None):
     """Convert a single markdown file to docx"""
     try:
-        # Use pypandoc to convert markdown to docx
-        pypandoc.convert_file(
-            str(md_file_path), 
-            'docx', 
-            outputfile=str(output_path),
-            extra_args=[
-                '--standalone'
-            ]
-        )
+        convert_document(md_file_path, output_path, backend, fast_path, cache, profiler=profiler)
         return True
     except Exception as e:
         print(f"Error converting {md_file_path}: {str(e)}")
         return False
 
-def find_markdown_files(directory):
+def default_jobs():
+    """Number of parallel conversions to run when --jobs is not given"""
+    return os.cpu_count() or 1
+
+# One step of a batch, as yielded by convert_batch() and convert_tree():
+# kind is 'started', 'converted', 'failed', 'skipped' (another file already
+# produces output_path; owner is that file) or 'cancelled' (a queued file that
+# was dropped when the batch was cancelled, or, with md_file and output_path
+# None, the end of a cancelled batch). seconds is the conversion time.
+ConversionEvent = namedtuple('ConversionEvent', 'kind md_file output_path error seconds owner')
+ConversionEvent.__new__.__defaults__ = (None, 0.0, None)
+
+def _convert_job(job, options):
+    """Worker for convert_batch(): returns (error message or None, seconds)"""
+    md_file, output_path = job
+    started = time.perf_counter()
+    try:
+        convert_document(md_file, output_path, **options)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return error, time.perf_counter() - started
+
+def _finished_event(job, result):
+    md_file, output_path = job
+    error, seconds = result
+    return ConversionEvent('converted' if error is None else 'failed', md_file, output_path, error, seconds)
+
+# How often a batch waiting for a conversion checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.1
+
+def convert_batch(conversions, jobs=None, cancel=None, **options):
+    """
+    Convert (md_file, output_path) pairs using a pool of worker threads,
+    yielding a ConversionEvent as each one is started and finished.
+
+    Each conversion runs in its own pandoc process, so threads are enough to
+    keep every core busy. 'started' is reported once a worker picks a file
+    up; finished events come in the same order as conversions, so a log
+    reads the same regardless of jobs. Setting the threading.Event cancel
+    stops new conversions from starting: files queued for a worker are
+    dropped and reported as 'cancelled', the ones already running finish
+    and are reported, and a final 'cancelled' event ends the batch.
+    Keyword options are passed on to convert_document().
+
+    The pieces of split files (see convert_in_chunks()) all run on one pool
+    of jobs threads, so a batch of large files never runs more than jobs
+    pandoc processes for them, however many files are split at once.
+    """
+    jobs = jobs or default_jobs()
+    if 'split_executor' not in options:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='split') as split_executor:
+            yield from convert_batch(conversions, jobs, cancel, split_executor=split_executor, **options)
+        return
+    if jobs <= 1:
+        for job in conversions:
+            if cancel is not None and cancel.is_set():
+                break
+            yield ConversionEvent('started', *job)
+            yield _finished_event(job, _convert_job(job, options))
+    else:
+        yield from _convert_parallel(conversions, jobs, cancel, options)
+    if cancel is not None and cancel.is_set():
+        yield ConversionEvent('cancelled', None, None)
+
+def _convert_parallel(conversions, jobs, cancel, options):
+    """The jobs > 1 part of convert_batch()"""
+    cancelled = (lambda: False) if cancel is None else cancel.is_set
+    # Workers report each file they start here, and None whenever one finishes
+    notices = queue.Queue()
+    
+    def run(job):
+        if cancelled():
+            return None  # Picked up after the batch was cancelled
+        notices.put(job)
+        return _convert_job(job, options)
+    
+    def started_events(block_until=None):
+        """'started' events reported so far; with a future, wait until it is done"""
+        while True:
+            if block_until is not None and block_until.done():
+                block_until = None
+            try:
+                if block_until is None:
+                    notice = notices.get_nowait()
+                else:
+                    notice = notices.get(timeout=None if cancel is None else CANCEL_POLL_SECONDS)
+            except queue.Empty:
+                if block_until is None:
+                    return
+                if cancelled():
+                    drop_queued()
+                continue
+            if notice is not None:
+                yield ConversionEvent('started', *notice)
+    
+    def drop_queued():
+        for _, future in window:
+            future.cancel()
+    
+    def finished_events(job, future):
+        yield from started_events(block_until=future)
+        if future.cancelled() or future.result() is None:
+            yield ConversionEvent('cancelled', *job)
+        else:
+            yield _finished_event(job, future.result())
+    
+    # conversions may be a generator fed by the folder walk, so only keep a
+    # small window of work queued instead of submitting everything up front
+    window = deque()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for job in conversions:
+            if cancelled():
+                break
+            future = executor.submit(run, job)
+            future.add_done_callback(lambda _: notices.put(None))
+            window.append((job, future))
+            yield from started_events()
+            if len(window) >= jobs * 2:
+                yield from finished_events(*window.popleft())
+        if cancelled():
+            drop_queued()
+        while window:
+            yield from finished_events(*window.popleft())
+
+def convert_many(conversions, jobs=None, **options):
+    """
+    Convert (md_file, output_path) pairs in parallel (see convert_batch()).
+
+    Results are yielded as (md_file, output_path, error) in the same order
+    as conversions, where error is None on success.
+    """
+    for event in convert_batch(conversions, jobs, **options):
+        if event.kind in ('converted', 'failed'):
+            yield event.md_file, event.output_path, event.error
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown', '.mdown')
+DEFAULT_EXCLUDES = ['.git', 'node_modules']
+
+def is_markdown_file(path):
+    """True if path has one of the markdown extensions"""
+    return str(path).lower().endswith(MARKDOWN_EXTENSIONS)
+
+def markdown_sort_key(name):
+    """
+    Sort key for file names in one folder: by name, except that of files
+    sharing a stem the .md one comes first. The first file planned keeps a
+    DOCX name (see ConversionPlan), so notes.md, the only extension earlier
+    versions converted, wins over notes.markdown.
+    """
+    stem, extension = os.path.splitext(name)
+    extension = extension.lower()
+    rank = MARKDOWN_EXTENSIONS.index(extension) if extension in MARKDOWN_EXTENSIONS else len(MARKDOWN_EXTENSIONS)
+    return stem.casefold(), rank, name
+
+def _matches(relative_path, patterns):
+    """True if a relative path or its final name matches any glob pattern"""
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(name, pattern)
+               for pattern in patterns)
+
+def iter_markdown_files(directory, include=None, exclude=DEFAULT_EXCLUDES, follow_symlinks=False, skip=()):
+    """
+    Yield markdown files under directory as soon as they are found.
+
+    include and exclude are glob patterns matched against each path relative
+    to directory and against its bare name; excluded folders are not entered
+    at all. With follow_symlinks, symlinked folders are walked too and each
+    real folder is only visited once, so symlink loops cannot recurse forever.
+    Folders listed in skip (e.g. an output folder inside the input) are ignored.
+    """
+    directory = Path(directory)
+    skip = {Path(path).resolve() for path in skip}
+    # Each stack entry carries the (device, inode) pairs of the folders above
+    # it, so a symlink pointing back up the tree is recognised as a loop
+    stack = [(directory, frozenset())]
+    while stack:
+        current, ancestors = stack.pop()
+        try:
+            stat = current.stat()
+            folder_id = (stat.st_dev, stat.st_ino)
+            if folder_id in ancestors:
+                continue  # Symlink loop
+            ancestors = ancestors | {folder_id}
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: markdown_sort_key(entry.name))
+        except OSError:
+            continue  # Unreadable folder, as os.walk would skip it
+        
+        subdirs = []
+        for entry in entries:
+            path = Path(entry.path)
+            relative = path.relative_to(directory).as_posix()
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if (not skip or path.resolve() not in skip) and not _matches(relative, exclude or []):
+                        subdirs.append((path, ancestors))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if not is_markdown_file(entry.name) or _matches(relative, exclude or []):
+                continue
+            if include and not _matches(relative, include):
+                continue
+            yield path
+        # Walk subfolders in name order
+        stack.extend(reversed(subdirs))
+
+def find_markdown_files(directory, **kwargs):
     """Recursively find all markdown files in directory"""
-    markdown_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.md'):
-                markdown_files.append(Path(root) / file)
-    return markdown_files
+    return list(iter_markdown_files(directory, **kwargs))
+
+# --merge writes one DOCX for the whole tree, or one for each folder
+MERGE_MODES = ('tree', 'dir')
+
+# A raw Word page break, placed between files with --page-breaks
+PAGE_BREAK_MARKDOWN = '```{=openxml}\n<w:p><w:r><w:br w:type="page"/></w:r></w:p>\n```\n'
+
+def _natural_name(name):
+    return [int(part) if part.isdigit() else part.casefold() for part in re.split(r'(\d+)', name)]
+
+def natural_key(path):
+    """Sort key that puts chapter2.md before chapter10.md, and a folder's files before its subfolders"""
+    parts = Path(path).parts
+    return [(1, _natural_name(name)) for name in parts[:-1]] + [(0, _natural_name(name)) for name in parts[-1:]]
+
+def plan_merge(markdown_files, source_dir, output_dir, mode='tree'):
+    """Group files by the DOCX --merge writes them into
+
+    Returns {output path: [markdown files in natural order]}. In tree mode
+    everything goes into <source folder>.docx; in dir mode each folder's own
+    files go into <folder>.docx next to where the folder is mirrored.
+    """
+    root_name = f"{source_dir.name or 'merged'}.docx"
+    groups = {}
+    for md_file in markdown_files:
+        folder = md_file.parent.relative_to(source_dir)
+        if mode == 'tree' or not folder.parts:
+            output_path = output_dir / root_name
+        else:
+            output_path = output_dir / folder.parent / f"{folder.name}.docx"
+        groups.setdefault(output_path, []).append(md_file)
+    return {output_path: sorted(files, key=lambda path: natural_key(path.relative_to(source_dir)))
+            for output_path, files in sorted(groups.items(), key=lambda item: natural_key(item[0]))}
+
+def merge_markdown_files(md_files, output_path, source_dir, page_breaks=False, toc=False):
+    """Convert md_files, in order, into one DOCX with a single pandoc run, raising on failure"""
+    # Paths relative to source_dir keep the command line short; the
+    # rebase_relative_paths extension makes each file's images resolve
+    # against its own folder rather than the working directory
+    inputs = [str(path.relative_to(source_dir)) for path in md_files]
+    command = [pypandoc.get_pandoc_path(), '--from', 'markdown+rebase_relative_paths', '--to', 'docx',
+               '--output', str(Path(output_path).resolve())] + PANDOC_ARGS
+    if toc:
+        command.append('--toc')
+    separator = None
+    try:
+        if page_breaks and len(inputs) > 1:
+            with tempfile.NamedTemporaryFile('w', suffix='.md', delete=False, encoding='utf-8') as separator:
+                separator.write(PAGE_BREAK_MARKDOWN)
+            inputs = [item for path in inputs for item in (separator.name, path)][1:]
+        result = subprocess.run(command + inputs, cwd=source_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finally:
+        if separator is not None:
+            os.unlink(separator.name)
+    if result.returncode != 0:
+        error = result.stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(error or f"pandoc exited with status {result.returncode}")
+
+def _merge_job(job, options):
+    """Worker for merge_many(): returns (output path, markdown files, error message or None)"""
+    output_path, md_files = job
+    try:
+        merge_markdown_files(md_files, output_path, **options)
+        return output_path, md_files, None
+    except Exception as e:
+        return output_path, md_files, str(e)
+
+def merge_many(groups, jobs=None, **options):
+    """Write each merged DOCX in groups, up to jobs at once
+
+    Yields (output path, markdown files, error) in the order of groups.
+    """
+    for output_path in groups:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as executor:
+        yield from executor.map(lambda job: _merge_job(job, options), groups.items())
+
+def collect(iterable, into):
+    """Pass items through unchanged while appending each one to the list into"""
+    for item in iterable:
+        into.append(item)
+        yield item
+
+class ConversionPlan:
+    """
+    Maps source markdown files to the DOCX paths they will be written to.
+
+    Each output folder is created once, the first time a file needs it,
+    instead of once per file. Two sources that would produce the same DOCX
+    (e.g. notes.md and notes.markdown) are a collision: the first one found
+    keeps the output and the others are recorded in collisions and never
+    converted, so nothing is silently overwritten. iter_markdown_files()
+    lists notes.md first, so it is the one converted.
+    """
+    
+    def __init__(self, source_dir, output_dir, create_dirs=True, profiler=None):
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir)
+        self.create_dirs = create_dirs
+        self.profiler = profiler or NULL_PROFILER
+        self.entries = []      # (md_file, output_path)
+        self.collisions = []   # (md_file, output_path, md_file that claimed it first)
+        self.folders = set()   # Output folders needed by the plan
+        self._claims = {}      # normalised output path -> (md_file, output_path)
+    
+    def _claim_key(self, output_path):
+        # Windows and macOS file systems are case-insensitive by default
+        key = str(output_path)
+        return key.casefold() if sys.platform in ('win32', 'darwin') else key
+    
+    def add(self, md_file):
+        """Plan one file; returns its output path, or None on a collision"""
+        relative = md_file.relative_to(self.source_dir)
+        output_path = self.output_dir / relative.parent / (md_file.stem + ".docx")
+        key = self._claim_key(output_path)
+        
+        claim = self._claims.get(key)
+        if claim is not None and claim[0] != md_file:
+            self.collisions.append((md_file, output_path, claim[0]))
+            return None
+        if claim is None:
+            self._claims[key] = (md_file, output_path)
+            self.entries.append((md_file, output_path))
+        
+        if output_path.parent not in self.folders:
+            self.folders.add(output_path.parent)
+            if self.create_dirs:
+                with self.profiler.stage('mkdir', md_file):
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path
+    
+    def add_all(self, markdown_files):
+        """Plan files as they arrive, yielding (md_file, output_path) for each one to convert"""
+        for md_file in markdown_files:
+            output_path = self.add(md_file)
+            if output_path is not None:
+                yield md_file, output_path
+    
+    def discard(self, source_path):
+        """Forget a deleted source file, or every file under a deleted folder; returns their outputs"""
+        source_path = Path(source_path)
+        outputs = []
+        for key, (md_file, output_path) in list(self._claims.items()):
+            if md_file == source_path or source_path in md_file.parents:
+                del self._claims[key]
+                outputs.append(output_path)
+        if outputs:
+            gone = set(outputs)
+            self.entries = [entry for entry in self.entries if entry[1] not in gone]
+        return outputs
+    
+    def report(self):
+        """Lines describing the plan, for --dry-run"""
+        lines = []
+        for md_file, output_path in self.entries:
+            lines.append(f"{md_file.relative_to(self.source_dir)} -> {output_path.relative_to(self.output_dir)}")
+        for md_file, output_path, owner in self.collisions:
+            lines.append(f"COLLISION: {md_file.relative_to(self.source_dir)} -> "
+                         f"{output_path.relative_to(self.output_dir)} "
+                         f"(already produced by {owner.relative_to(self.source_dir)})")
+        return lines
+
+def build_plan(markdown_files, source_dir, output_dir, create_dirs=True, profiler=None):
+    """Plan a whole batch up front"""
+    plan = ConversionPlan(source_dir, output_dir, create_dirs, profiler)
+    for _ in plan.add_all(markdown_files):
+        pass
+    return plan
+
+def convert_tree(source_dir, output_dir, markdown_files=None, jobs=None, cancel=None, plan=None, select=None,
+                 include=None, exclude=DEFAULT_EXCLUDES, follow_symlinks=False, **options):
+    """
+    Convert the markdown files under source_dir into output_dir, mirroring
+    the folder structure, and yield a ConversionEvent for every step.
+
+    This is the batch engine behind the command line, the GUI, the drag and
+    drop script and the web interface. Unless markdown_files gives the files
+    to convert, the folder is walked (include, exclude and follow_symlinks
+    as for iter_markdown_files()) while the first files are already being
+    converted. Files are planned into plan (a new ConversionPlan by
+    default) so a caller can inspect its entries and collisions afterwards;
+    a colliding file is reported as 'skipped'. select, if given, filters the
+    planned (md_file, output_path) pairs, e.g. to leave out unchanged files.
+    jobs, cancel and the other options are passed on to convert_batch().
+    """
+    source_dir, output_dir = Path(source_dir), Path(output_dir)
+    profiler = options.get('profiler') or NULL_PROFILER
+    if markdown_files is None:
+        markdown_files = profiler.timed_iter('walk', iter_markdown_files(
+            source_dir, include=include, exclude=exclude, follow_symlinks=follow_symlinks,
+            skip=[output_dir.resolve()]))
+    if plan is None:
+        plan = ConversionPlan(source_dir, output_dir, profiler=profiler)
+    
+    skipped = deque()
+    def planned():
+        for md_file in markdown_files:
+            output_path = plan.add(md_file)
+            if output_path is None:
+                skipped.append(plan.collisions[-1])
+            else:
+                yield md_file, output_path
+    
+    conversions = planned() if select is None else select(planned())
+    for event in convert_batch(conversions, jobs, cancel, **options):
+        while skipped:
+            md_file, output_path, owner = skipped.popleft()
+            yield ConversionEvent('skipped', md_file, output_path, owner=owner)
+        yield event
+    while skipped:
+        md_file, output_path, owner = skipped.popleft()
+        yield ConversionEvent('skipped', md_file, output_path, owner=owner)
 
 def preserve_folder_structure(source_file, source_root, output_root):
     """Create the same folder structure in output directory"""
@@ -68,6 +697,207 @@ def preserve_folder_structure(source_file, source_root, output_root):
     output_folder.mkdir(parents=True, exist_ok=True)
     return output_folder
 
+# Written to the output root by --incremental to remember what was converted
+MANIFEST_NAME = '.markdown_to_docx_manifest.json'
+
+def file_sha256(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(output_dir):
+    """Load the incremental manifest from output_dir, or an empty one"""
+    try:
+        with open(Path(output_dir) / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    """Atomically write the incremental manifest to output_dir"""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'files': manifest}, f, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def source_fingerprint(md_file, previous=None):
+    """
+    Size, mtime and hash of a source file for the manifest.
+
+    The hash is only recomputed when size or mtime differ from the previous
+    entry, so unchanged files cost a single stat().
+    """
+    stat = md_file.stat()
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime:
+        return {'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': previous.get('hash')}
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': file_sha256(md_file)}
+
+def plan_incremental(conversions, source_dir, output_dir, manifest, fingerprints, up_to_date):
+    """
+    Yield the conversions whose source is new or changed since the manifest.
+
+    Unchanged conversions are appended to up_to_date instead, and every
+    source's current manifest entry is stored in fingerprints under its
+    relative path.
+    """
+    for md_file, output_path in conversions:
+        key = md_file.relative_to(source_dir).as_posix()
+        previous = manifest.get(key)
+        entry = source_fingerprint(md_file, previous)
+        entry['output'] = output_path.relative_to(output_dir).as_posix()
+        fingerprints[key] = entry
+        
+        if (previous and previous.get('hash') == entry['hash']
+                and previous.get('output') == entry['output'] and output_path.exists()):
+            up_to_date.append((md_file, output_path))
+        else:
+            yield md_file, output_path
+
+def prune_orphans(manifest, fingerprints, output_dir):
+    """Delete DOCX files whose source markdown no longer exists; returns how many"""
+    removed = 0
+    output_dir = Path(output_dir)
+    current_outputs = {entry['output'] for entry in fingerprints.values()}
+    for key, entry in manifest.items():
+        if key in fingerprints or not entry.get('output') or entry['output'] in current_outputs:
+            continue
+        orphan = output_dir / entry['output']
+        try:
+            orphan.unlink()
+            removed += 1
+        except FileNotFoundError:
+            continue
+        # Remove folders left empty, but never the output root itself
+        parent = orphan.parent
+        while parent != output_dir and output_dir in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+    return removed
+
+def remove_mirrored_output(source_path, plan, manifest=None):
+    """Delete the DOCX files mirrored from a source file or folder that no longer exists"""
+    relative = source_path.relative_to(plan.source_dir).as_posix()
+    if manifest is not None:
+        for key in [key for key in manifest if key == relative or key.startswith(relative + '/')]:
+            del manifest[key]
+    gone = {}
+    for output_path in plan.discard(source_path):
+        gone[str(output_path)] = {'output': output_path.relative_to(plan.output_dir).as_posix()}
+    return prune_orphans(gone, {}, plan.output_dir)
+
+def print_result(md_file, output_path, error, source_dir, output_dir):
+    """Print the progress lines for one finished conversion"""
+    print(f"Converting: {md_file.relative_to(source_dir)} -> {output_path.relative_to(output_dir)}")
+    if error is None:
+        print(f"  ✓ Success")
+    else:
+        print(f"Error converting {md_file}: {error}")
+        print(f"  ✗ Failed")
+
+def watch_and_convert(plan, jobs=None, manifest=None, polling=False,
+                      debounce=None, include=None, exclude=DEFAULT_EXCLUDES, **options):
+    """
+    Reconvert markdown files under plan.source_dir whenever they change.
+
+    Runs until interrupted. New files are added to the plan (and checked for
+    collisions), deleted markdown files have their DOCX removed from the
+    output folder. When a manifest is given (--incremental) it is kept up
+    to date after every batch of changes.
+    """
+    from watcher import iter_changes, DEFAULT_DEBOUNCE
+    
+    source_dir, output_dir = plan.source_dir, plan.output_dir
+    # Watched paths are absolute; a relative -o would never match them
+    resolved_output = output_dir.resolve()
+    
+    def ignored_folder(path):
+        """Folders iter_markdown_files() would not enter are not watched either"""
+        if path == resolved_output:
+            return True  # Our own output inside the source tree
+        return _matches(path.relative_to(source_dir).as_posix(), exclude or [])
+    
+    print(f"Watching {source_dir} for changes (press Ctrl+C to stop)...")
+    try:
+        for touched in iter_changes(source_dir, debounce or DEFAULT_DEBOUNCE, polling, ignore=ignored_folder):
+            changed = []
+            removed = 0
+            for path in sorted(touched, key=lambda path: (path.parent, markdown_sort_key(path.name))):
+                if path == resolved_output or resolved_output in path.parents:
+                    continue  # Our own output inside the source tree
+                relative = path.relative_to(source_dir).as_posix()
+                if any(_matches(part, exclude or []) for part in relative.split('/')):
+                    continue
+                if path.is_file():
+                    if is_markdown_file(path) and (not include or _matches(relative, include)):
+                        changed.append(path)
+                elif not path.exists():
+                    removed += remove_mirrored_output(path, plan, manifest)
+            
+            collisions_before = len(plan.collisions)
+            conversions = list(plan.add_all(changed))
+            for md_file, output_path, owner in plan.collisions[collisions_before:]:
+                print(f"Skipping {md_file.relative_to(source_dir)}: {output_path.relative_to(output_dir)} "
+                      f"is already produced by {owner.relative_to(source_dir)}")
+            if manifest is not None:
+                # Skip files that were touched but not actually modified
+                fingerprints = {}
+                conversions = list(plan_incremental(conversions, source_dir, output_dir, manifest,
+                                                    fingerprints, []))
+            
+            for md_file, output_path, error in convert_many(conversions, jobs, **options):
+                print_result(md_file, output_path, error, source_dir, output_dir)
+                if error is None and manifest is not None:
+                    key = md_file.relative_to(source_dir).as_posix()
+                    manifest[key] = fingerprints[key]
+            if removed:
+                print(f"Removed {removed} DOCX files whose markdown was deleted")
+            if manifest is not None and (conversions or removed):
+                save_manifest(output_dir, manifest)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+def merge_tree(discovered, source_dir, output_dir, args):
+    """The --merge part of main(): write and report the merged DOCX files"""
+    groups = plan_merge(discovered, source_dir, output_dir, args.merge)
+    if args.dry_run:
+        for output_path, md_files in groups.items():
+            print(f"{output_path.relative_to(output_dir)}:")
+            for md_file in md_files:
+                print(f"  {md_file.relative_to(source_dir)}")
+        print("-" * 60)
+        print(f"Dry run: {sum(len(files) for files in groups.values())} files would be merged "
+              f"into {len(groups)} documents")
+        return
+    
+    if not groups:
+        print("No markdown files found in the directory.")
+        return
+    
+    successful = failed = 0
+    options = {'source_dir': source_dir, 'page_breaks': args.page_breaks, 'toc': args.toc}
+    for output_path, md_files, error in merge_many(groups, args.jobs, **options):
+        print(f"Merging: {len(md_files)} files -> {output_path.relative_to(output_dir)}")
+        if error is None:
+            successful += 1
+            print(f"  ✓ Success")
+        else:
+            failed += 1
+            print(f"Error merging into {output_path}: {error}")
+            print(f"  ✗ Failed")
+    
+    print("-" * 60)
+    print(f"Merge complete!")
+    print(f"Documents written: {successful}")
+    print(f"Failed documents: {failed}")
+    print(f"Output location: {output_dir}")
+
 def main():
     """Main conversion function"""
     parser = argparse.ArgumentParser(
@@ -78,6 +908,20 @@ Examples:
   %(prog)s                           # Convert files in current directory
   %(prog)s -i docs/                  # Convert files in docs/ directory
   %(prog)s -i notes/ -o converted/   # Specify input and output directories
+  %(prog)s -i docs/ -j 4             # Run at most 4 conversions at once
+  %(prog)s -i notes/ --backend server  # Reuse long-lived pandoc processes
+  %(prog)s -i notes/ --fast-path     # Write simple notes without pandoc
+  %(prog)s -i api/ --split-threshold 4  # Split files over 4 MB into parallel pieces
+  %(prog)s -i docs/ --cache          # Skip files converted in earlier runs
+  %(prog)s -i docs/ --optimize-images  # Embed downscaled copies of large images
+  %(prog)s --cache-stats             # Show what the cache holds
+  %(prog)s -i docs/ -o mirror/ --incremental  # Only convert what changed
+  %(prog)s -i docs/ -o mirror/ --watch        # Keep converting as files are saved
+  %(prog)s -i repo/ --exclude build --include 'docs/*'  # Filter with globs
+  %(prog)s -i docs/ --dry-run        # Show what would be converted where
+  %(prog)s -i docs/ --profile        # Show where the time goes, write profile.json
+  %(prog)s -i manual/ --merge --toc --page-breaks  # One DOCX for the whole folder
+  %(prog)s -i manual/ --merge dir    # One DOCX per folder
         """
     )
     
@@ -94,6 +938,183 @@ Examples:
         help='Output directory for converted files (default: auto-generated timestamped folder)'
     )
     
+    parser.add_argument(
+        '--include',
+        action='append',
+        default=[],
+        metavar='GLOB',
+        help='Only convert files whose relative path or name matches GLOB (repeatable)'
+    )
+    
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=[],
+        metavar='GLOB',
+        help=f'Skip files and folders matching GLOB (repeatable; always skips {", ".join(DEFAULT_EXCLUDES)})'
+    )
+    
+    parser.add_argument(
+        '--follow-symlinks',
+        action='store_true',
+        help='Also walk symlinked folders (links back up the tree are detected and skipped)'
+    )
+    
+    parser.add_argument(
+        '-n', '--dry-run',
+        action='store_true',
+        help='Only print which file would be written where (and any name collisions)'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=default_jobs(),
+        help='Number of files to convert in parallel (default: number of CPUs)'
+    )
+    
+    parser.add_argument(
+        '--backend',
+        choices=BACKENDS,
+        default='subprocess',
+        help='How to run pandoc: a new process per file, or a pool of persistent '
+             '`pandoc server` processes (default: subprocess)'
+    )
+    
+    parser.add_argument(
+        '--servers',
+        type=int,
+        default=DEFAULT_SERVERS,
+        help=f'Number of pandoc server processes for --backend server (default: {DEFAULT_SERVERS})'
+    )
+    
+    parser.add_argument(
+        '--fast-path',
+        action='store_true',
+        help='Convert documents that only use headings, lists, quotes, code and '
+             'emphasis in-process, without starting pandoc'
+    )
+    
+    parser.add_argument(
+        '--split-threshold',
+        type=float,
+        default=DEFAULT_SPLIT_THRESHOLD_MB,
+        metavar='MB',
+        help='Split files larger than this at their headings and convert the pieces in '
+             f'parallel, then merge them; 0 disables (default: {DEFAULT_SPLIT_THRESHOLD_MB})'
+    )
+    
+    parser.add_argument(
+        '--optimize-images',
+        action='store_true',
+        help='Embed downscaled, recompressed copies of local PNG and JPEG images, made once per '
+             'distinct image and kept in the cache folder (needs Pillow)'
+    )
+    
+    parser.add_argument(
+        '--image-max-size',
+        type=int,
+        default=DEFAULT_MAX_IMAGE_SIZE,
+        metavar='PX',
+        help=f'With --optimize-images, longest side of an embedded image in pixels (default: {DEFAULT_MAX_IMAGE_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--merge',
+        nargs='?',
+        const='tree',
+        choices=MERGE_MODES,
+        help='Write one DOCX for the whole tree (--merge or --merge tree) or one per folder '
+             '(--merge dir), converting the files in natural sort order in a single pandoc run'
+    )
+    
+    parser.add_argument(
+        '--page-breaks',
+        action='store_true',
+        help='With --merge, start each file on a new page'
+    )
+    
+    parser.add_argument(
+        '--toc',
+        action='store_true',
+        help='With --merge, add a table of contents'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reuse DOCX files from earlier runs for markdown that has not changed'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=str(DEFAULT_CACHE_DIR),
+        help=f'Where to keep cached DOCX files (default: {DEFAULT_CACHE_DIR})'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f'Cache size budget in MB; least recently used files are evicted first (default: {DEFAULT_CACHE_SIZE_MB})'
+    )
+    
+    parser.add_argument(
+        '--cache-stats',
+        action='store_true',
+        help='Show cache statistics and exit'
+    )
+    
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Delete all cached DOCX files and exit'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Keep the --output folder as a mirror: only convert new or changed files '
+             'and delete DOCX files whose markdown was removed'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='After converting, keep running and reconvert files as they change'
+    )
+    
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='With --watch, poll the folder instead of using inotify'
+    )
+    
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=0.5,
+        help='With --watch, seconds of quiet to wait before converting a burst of changes (default: 0.5)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=DEFAULT_PROFILE_PATH,
+        metavar='FILE',
+        help='Time each stage (walk, mkdir, cache, pandoc startup and rendering, ...) per file, '
+             f'print the slowest files and write a JSON report to FILE (default: {DEFAULT_PROFILE_PATH})'
+    )
+    
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=DEFAULT_TOP,
+        metavar='N',
+        help=f'With --profile, how many of the slowest files to list (default: {DEFAULT_TOP})'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -102,6 +1123,53 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.split_threshold < 0:
+        parser.error("--split-threshold must not be negative")
+    if args.image_max_size < 1:
+        parser.error("--image-max-size must be at least 1")
+    if args.profile_top < 0:
+        parser.error("--profile-top must not be negative")
+    if args.profile and (args.merge or args.dry_run):
+        parser.error("--profile cannot be combined with --merge or --dry-run")
+    
+    cache = ConversionCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    
+    if args.clear_cache:
+        freed = cache.clear()
+        print(f"Cleared cache at {cache.directory} ({format_size(freed)} freed)")
+        return
+    
+    if args.cache_stats:
+        stats = cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        print(f"Cache directory: {stats['directory']}")
+        print(f"Cached files: {stats['entries']}")
+        print(f"Size: {format_size(stats['size_bytes'])} of {format_size(stats['max_bytes'])}")
+        print(f"Hits: {stats['hits']}, misses: {stats['misses']}"
+              + (f" ({stats['hits'] / lookups:.0%} hit rate)" if lookups else ""))
+        return
+    
+    if not args.cache:
+        cache = None
+    
+    images = None
+    if args.optimize_images:
+        try:
+            from image_cache import ImageCache
+            images = ImageCache(Path(args.cache_dir) / 'images', args.image_max_size)
+        except ImportError:
+            print("Warning: --optimize-images needs Pillow (pip install Pillow); embedding original images")
+    
+    if (args.page_breaks or args.toc) and not args.merge:
+        parser.error("--page-breaks and --toc need --merge")
+    if args.merge and (args.incremental or args.watch):
+        parser.error("--merge cannot be combined with --incremental or --watch")
+    
+    if args.incremental and not args.output:
+        parser.error("--incremental needs a fixed output folder (-o/--output)")
+    
     # Define the source directory
     source_dir = Path(args.input).resolve()
     
@@ -114,46 +1182,113 @@ Examples:
         sys.exit(1)
     
     # Create output directory
-    output_dir = setup_output_directory(source_dir, args.output)
+    output_dir = setup_output_directory(source_dir, args.output, create=not args.dry_run)
     print(f"Converting markdown files from: {source_dir}")
     print(f"Output directory: {output_dir}")
     print("-" * 60)
     
-    # Find all markdown files
-    markdown_files = find_markdown_files(source_dir)
+    discovered = iter_markdown_files(source_dir, include=args.include,
+                                     exclude=DEFAULT_EXCLUDES + args.exclude,
+                                     follow_symlinks=args.follow_symlinks, skip=[output_dir.resolve()])
     
-    if not markdown_files:
-        print("No markdown files found in the directory.")
+    profiler = None
+    if args.profile:
+        from profiler import Profiler, measure_pandoc_startup
+        # Measured before the clock starts, so it does not count towards the run
+        profiler = Profiler(pandoc_startup=measure_pandoc_startup())
+        discovered = profiler.timed_iter('walk', discovered)
+    
+    if args.merge:
+        merge_tree(discovered, source_dir, output_dir, args)
         return
     
-    print(f"Found {len(markdown_files)} markdown files to convert:")
+    if args.dry_run:
+        plan = build_plan(discovered, source_dir, output_dir, create_dirs=False)
+        for line in plan.report():
+            print(line)
+        print("-" * 60)
+        print(f"Dry run: {len(plan.entries)} files would be converted into {len(plan.folders)} folders")
+        if plan.collisions:
+            print(f"Collisions: {len(plan.collisions)} files would not be converted because "
+                  f"another file produces the same DOCX")
+        return
+    
+    backend = start_backend(args.backend, args.servers)
+    
+    # Files are converted while the walk is still running; markdown_files
+    # collects them as they are found so the total can be reported at the end
+    print("Searching for markdown files and converting as they are found:")
+    # Each file is planned (output folder created once, collisions checked)
+    # before it is handed to a worker
+    markdown_files = []
+    plan = ConversionPlan(source_dir, output_dir, profiler=profiler)
+    select = None
+    
+    if args.incremental:
+        manifest = load_manifest(output_dir)
+        fingerprints = {}
+        up_to_date = []
+        select = lambda conversions: plan_incremental(conversions, source_dir, output_dir, manifest,
+                                                      fingerprints, up_to_date)
+        new_manifest = {}
     
     # Convert each file
     successful_conversions = 0
     failed_conversions = 0
     
-    for md_file in markdown_files:
-        # Preserve folder structure
-        output_folder = preserve_folder_structure(md_file, source_dir, output_dir)
-        
-        # Create output filename
-        docx_filename = md_file.stem + ".docx"
-        output_path = output_folder / docx_filename
-        
-        print(f"Converting: {md_file.relative_to(source_dir)} -> {output_path.relative_to(output_dir)}")
+    # Results come back in discovery order, so the log reads the same
+    # regardless of --jobs
+    options = {'backend': backend, 'fast_path': args.fast_path, 'cache': cache,
+               'split_threshold': int(args.split_threshold * 1024 * 1024), 'images': images,
+               'profiler': profiler}
+    events = convert_tree(source_dir, output_dir, markdown_files=collect(discovered, markdown_files),
+                          jobs=args.jobs, plan=plan, select=select, **options)
+    for event in events:
+        if event.kind not in ('converted', 'failed'):
+            continue  # Collisions are listed after the summary
+        md_file, output_path, error = event.md_file, event.output_path, event.error
+        print_result(md_file, output_path, error, source_dir, output_dir)
         
-        # Convert the file
-        if convert_markdown_to_docx(md_file, output_path):
+        if error is None:
             successful_conversions += 1
-            print(f"  ✓ Success")
+            if args.incremental:
+                key = md_file.relative_to(source_dir).as_posix()
+                new_manifest[key] = fingerprints[key]
         else:
             failed_conversions += 1
-            print(f"  ✗ Failed")
+    
+    if not markdown_files and not args.incremental and not args.watch:
+        print("No markdown files found in the directory.")
+        return
+    
+    print(f"Found {len(markdown_files)} markdown files")
+    
+    for md_file, output_path, owner in plan.collisions:
+        print(f"Skipped: {md_file.relative_to(source_dir)} -> {output_path.relative_to(output_dir)} "
+              f"is already produced by {owner.relative_to(source_dir)}")
+    
+    if args.incremental:
+        # Carry over the entries for unchanged files
+        for md_file, _ in up_to_date:
+            key = md_file.relative_to(source_dir).as_posix()
+            new_manifest[key] = fingerprints[key]
+        removed = prune_orphans(manifest, fingerprints, output_dir)
+        save_manifest(output_dir, new_manifest)
     
     print("-" * 60)
     print(f"Conversion complete!")
     print(f"Successfully converted: {successful_conversions} files")
     print(f"Failed conversions: {failed_conversions} files")
+    if plan.collisions:
+        print(f"Skipped (same output name as another file): {len(plan.collisions)} files")
+    if args.incremental:
+        print(f"Already up to date: {len(up_to_date)} files")
+        print(f"Removed orphaned files: {removed}")
+    if cache is not None:
+        print(f"Reused from cache: {cache.hits} files")
+        cache.save_stats()
+    if images is not None:
+        print(f"Images processed: {images.misses}, reused from cache: {images.hits}")
     print(f"Output location: {output_dir}")
     
     if failed_conversions > 0:
@@ -161,6 +1296,24 @@ Examples:
         print("- Complex markdown syntax not supported by pandoc")
         print("- File encoding issues")
         print("- Missing pandoc installation")
+    
+    if profiler is not None:
+        profiler.finish()
+        print("-" * 60)
+        for line in profiler.summary_lines(args.profile_top):
+            print(line)
+        profiler.write_json(args.profile, args.profile_top)
+        print(f"Profile written to {args.profile}")
+        # Only the first pass is profiled
+        options['profiler'] = None
+        plan.profiler = NULL_PROFILER
+    
+    if args.watch:
+        print("-" * 60)
+        watch_and_convert(plan, args.jobs,
+                          manifest=new_manifest if args.incremental else None,
+                          polling=args.poll, debounce=args.debounce, include=args.include,
+                          exclude=DEFAULT_EXCLUDES + args.exclude, **options)
 
 def check_dependencies():
     """Check if required dependencies are available"""
@@ -11,6 +11,9 @@ Features:
 - Easy output folder selection
 - Real-time conversion status
 - Error handling with helpful messages
+- Stays responsive on very large batches: the worker queues its updates and
+  the window applies them in batches, keeping only the latest log lines on
+  screen (failures can be shown on their own) and the full log in a file
 
 Author: Brennan Kenneth Brown
 License: MIT
@@ -20,11 +23,20 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import os
+import queue
 import sys
+from collections import deque
 from pathlib import Path
 import pypandoc
 from datetime import datetime
 
+# How often the window applies queued updates, and at most how many per round
+UI_POLL_MS = 100
+UI_EVENTS_PER_POLL = 5000
+# Log lines kept on screen; the full log goes to LOG_FILE_NAME in the output folder
+LOG_LINES_SHOWN = 1000
+LOG_FILE_NAME = "conversion_log.txt"
+
 class MarkdownConverterGUI:
     def __init__(self, root):
         self.root = root
@@ -36,10 +48,21 @@ class MarkdownConverterGUI:
         self.input_folder = tk.StringVar()
         self.output_folder = tk.StringVar()
         self.conversion_running = False
+        self.cancel_requested = threading.Event()
+        
+        # Tk may only be touched from the main thread, so every update goes
+        # through this queue and drain_ui_events() applies it
+        self.ui_events = queue.Queue()
+        self.log_lines = deque(maxlen=LOG_LINES_SHOWN)      # (message, is failure)
+        self.failure_lines = deque(maxlen=LOG_LINES_SHOWN)
+        self.log_file = None
+        self.early_log = []  # Lines logged before the log file could be opened
+        self.log_lock = threading.Lock()
         
         # Setup the GUI
         self.setup_gui()
         self.check_dependencies()
+        self.root.after(UI_POLL_MS, self.drain_ui_events)
     
     def setup_gui(self):
         """Create the main GUI layout"""
@@ -81,32 +104,48 @@ class MarkdownConverterGUI:
         
         ttk.Button(output_frame, text="Browse", command=self.browse_output_folder).grid(row=0, column=1)
         
+        # Conversion options
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=5, column=0, columnspan=3, sticky=tk.W)
+        self.use_server = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Keep pandoc running between files (faster for many small files)",
+                        variable=self.use_server).grid(row=0, column=0, sticky=tk.W)
+        self.profile = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Profile the conversion (slowest files, profile.json in the output folder)",
+                        variable=self.profile).grid(row=1, column=0, sticky=tk.W)
+        
         # Convert button
         self.convert_button = ttk.Button(main_frame, text="Convert Files", 
                                         command=self.start_conversion, style="Accent.TButton")
-        self.convert_button.grid(row=5, column=0, columnspan=3, pady=20)
+        self.convert_button.grid(row=6, column=0, columnspan=3, pady=20)
         
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, 
                                           maximum=100, length=400)
-        self.progress_bar.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        self.progress_bar.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
         
         # Status label
         self.status_var = tk.StringVar(value="Ready to convert files")
         self.status_label = ttk.Label(main_frame, textvariable=self.status_var, 
                                      font=("Helvetica", 10))
-        self.status_label.grid(row=7, column=0, columnspan=3, pady=(0, 10))
+        self.status_label.grid(row=8, column=0, columnspan=3, pady=(0, 10))
         
         # Results text area
-        ttk.Label(main_frame, text="Conversion Results:").grid(row=8, column=0, columnspan=3, sticky=tk.W, pady=(10, 5))
+        results_header = ttk.Frame(main_frame)
+        results_header.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 5))
+        results_header.columnconfigure(0, weight=1)
+        ttk.Label(results_header, text="Conversion Results:").grid(row=0, column=0, sticky=tk.W)
+        self.failures_only = tk.BooleanVar(value=False)
+        ttk.Checkbutton(results_header, text="Show failures only", variable=self.failures_only,
+                        command=self.refresh_log).grid(row=0, column=1, sticky=tk.E)
         
         # Frame for text widget and scrollbar
         text_frame = ttk.Frame(main_frame)
-        text_frame.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        text_frame.grid(row=10, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         text_frame.columnconfigure(0, weight=1)
         text_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(9, weight=1)
+        main_frame.rowconfigure(10, weight=1)
         
         self.results_text = tk.Text(text_frame, height=8, wrap=tk.WORD, font=("Consolas", 9))
         scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.results_text.yview)
@@ -118,7 +157,7 @@ class MarkdownConverterGUI:
         # Info label
         info_text = "💡 Tip: Select a folder containing .md files. The converter will preserve your folder structure!"
         ttk.Label(main_frame, text=info_text, font=("Helvetica", 9), 
-                 foreground="gray").grid(row=10, column=0, columnspan=3, pady=(10, 0))
+                 foreground="gray").grid(row=11, column=0, columnspan=3, pady=(10, 0))
     
     def check_dependencies(self):
         """Check if required dependencies are available"""
@@ -127,11 +166,11 @@ class MarkdownConverterGUI:
             pypandoc.get_pandoc_version()
             self.log_message("✅ Dependencies check passed - ready to convert!")
         except ImportError:
-            self.log_message("❌ Error: pypandoc is not installed.")
+            self.log_message("❌ Error: pypandoc is not installed.", failure=True)
             self.log_message("Please install it with: pip install pypandoc")
             self.convert_button.configure(state="disabled")
         except OSError:
-            self.log_message("❌ Error: pandoc is not installed on your system.")
+            self.log_message("❌ Error: pandoc is not installed on your system.", failure=True)
             self.log_message("Please install pandoc from: https://pandoc.org/installing.html")
             self.convert_button.configure(state="disabled")
     
@@ -147,19 +186,104 @@ class MarkdownConverterGUI:
         if folder:
             self.output_folder.set(folder)
     
-    def log_message(self, message):
-        """Add message to results text area"""
-        self.results_text.insert(tk.END, message + "\n")
+    def log_message(self, message, failure=False):
+        """Add message to the results (safe to call from any thread)"""
+        with self.log_lock:
+            if self.log_file is not None:
+                self.log_file.write(message + "\n")
+            else:
+                self.early_log.append(message)
+        self.ui_events.put(("log", (message, failure)))
+    
+    def set_status(self, text):
+        """Show text in the status line (safe to call from any thread)"""
+        self.ui_events.put(("status", text))
+    
+    def set_progress(self, percent):
+        """Move the progress bar (safe to call from any thread)"""
+        self.ui_events.put(("progress", percent))
+    
+    def open_log_file(self, path):
+        """Write the full log, including what was logged so far, to path"""
+        with self.log_lock:
+            self.log_file = open(path, "w", encoding="utf-8")
+            self.log_file.write("".join(line + "\n" for line in self.early_log))
+            self.early_log = []
+    
+    def close_log_file(self):
+        with self.log_lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+    
+    def drain_ui_events(self):
+        """Apply queued updates in one go, then check again after UI_POLL_MS"""
+        lines = []
+        status = progress = None
+        actions = []
+        try:
+            for _ in range(UI_EVENTS_PER_POLL):
+                kind, value = self.ui_events.get_nowait()
+                if kind == "log":
+                    lines.append(value)
+                elif kind == "status":
+                    status = value
+                elif kind == "progress":
+                    progress = value
+                else:
+                    actions.append((kind, value))
+        except queue.Empty:
+            pass
+        
+        # Only the latest status and progress matter
+        if lines:
+            self.show_log_lines(lines)
+        if status is not None:
+            self.status_var.set(status)
+        if progress is not None:
+            self.progress_var.set(progress)
+        for kind, value in actions:
+            if kind == "done":
+                self.conversion_complete()
+            elif kind == "ask_open":
+                self.ask_open_folder(*value)
+        self.root.after(UI_POLL_MS, self.drain_ui_events)
+    
+    def show_log_lines(self, lines):
+        """Append lines to the log and to the text area, dropping the oldest on screen"""
+        self.log_lines.extend(lines)
+        self.failure_lines.extend(line for line in lines if line[1])
+        if self.failures_only.get():
+            lines = [line for line in lines if line[1]]
+        if not lines:
+            return
+        lines = lines[-LOG_LINES_SHOWN:]
+        self.results_text.insert(tk.END, "".join(message + "\n" for message, _ in lines))
+        shown = int(self.results_text.index("end-1c").split(".")[0]) - 1
+        if shown > LOG_LINES_SHOWN:
+            self.results_text.delete("1.0", f"{shown - LOG_LINES_SHOWN + 1}.0")
+        self.results_text.see(tk.END)
+    
+    def refresh_log(self):
+        """Redraw the text area for the "Show failures only" setting"""
+        lines = self.failure_lines if self.failures_only.get() else self.log_lines
+        self.results_text.delete("1.0", tk.END)
+        self.results_text.insert(tk.END, "".join(message + "\n" for message, _ in lines))
         self.results_text.see(tk.END)
-        self.root.update_idletasks()
     
     def clear_results(self):
         """Clear the results text area"""
+        self.log_lines.clear()
+        self.failure_lines.clear()
+        self.early_log = []
         self.results_text.delete(1.0, tk.END)
     
     def start_conversion(self):
-        """Start the conversion process in a separate thread"""
+        """Start the conversion process in a separate thread (or cancel the running one)"""
         if self.conversion_running:
+            # Files already being converted finish; no new ones are started
+            self.cancel_requested.set()
+            self.convert_button.configure(state="disabled", text="Cancelling...")
             return
             
         # Validate input
@@ -171,9 +295,10 @@ class MarkdownConverterGUI:
             messagebox.showerror("Error", "The selected input folder does not exist.")
             return
         
-        # Disable convert button and start conversion
+        # The convert button becomes a cancel button while converting
         self.conversion_running = True
-        self.convert_button.configure(state="disabled", text="Converting...")
+        self.cancel_requested.clear()
+        self.convert_button.configure(state="normal", text="Cancel")
         self.clear_results()
         
         # Start conversion in separate thread to prevent GUI freezing
@@ -186,83 +311,120 @@ class MarkdownConverterGUI:
         try:
             # Import conversion functions from the original script
             from markdown_to_docx_converter import (
-                find_markdown_files, 
-                preserve_folder_structure, 
-                convert_markdown_to_docx,
-                setup_output_directory
+                iter_markdown_files, 
+                convert_tree,
+                setup_output_directory,
+                start_backend
             )
             
             source_dir = Path(self.input_folder.get()).resolve()
             output_base = self.output_folder.get() if self.output_folder.get() else None
             
-            self.status_var.set("Scanning for markdown files...")
+            self.set_status("Scanning for markdown files...")
             self.log_message(f"📁 Scanning folder: {source_dir}")
             
+            profiler = None
+            if self.profile.get():
+                from profiler import Profiler, measure_pandoc_startup
+                profiler = Profiler(pandoc_startup=measure_pandoc_startup())
+            
             # Find all markdown files
-            markdown_files = find_markdown_files(source_dir)
+            discovered = iter_markdown_files(source_dir)
+            if profiler is not None:
+                discovered = profiler.timed_iter('walk', discovered)
+            markdown_files = list(discovered)
             
             if not markdown_files:
                 self.log_message("⚠️  No markdown files found in the selected folder.")
-                self.status_var.set("No files to convert")
+                self.set_status("No files to convert")
                 return
             
             self.log_message(f"📋 Found {len(markdown_files)} markdown files to convert")
             
             # Setup output directory
             output_dir = setup_output_directory(source_dir, output_base)
+            self.open_log_file(output_dir / LOG_FILE_NAME)
             self.log_message(f"📤 Output directory: {output_dir}")
+            
+            requested_backend = 'server' if self.use_server.get() else 'subprocess'
+            backend = start_backend(requested_backend)
+            if backend != requested_backend:
+                self.log_message("⚠️  Could not start pandoc server - converting one process per file")
             self.log_message("-" * 50)
             
-            # Convert files
+            # Convert files, several at once; results arrive in folder order
             successful_conversions = 0
             failed_conversions = 0
-            
-            for i, md_file in enumerate(markdown_files):
-                # Update progress
-                progress = ((i + 1) / len(markdown_files)) * 100
-                self.progress_var.set(progress)
-                self.status_var.set(f"Converting file {i + 1} of {len(markdown_files)}")
-                
-                # Preserve folder structure
-                output_folder = preserve_folder_structure(md_file, source_dir, output_dir)
-                
-                # Create output filename
-                docx_filename = md_file.stem + ".docx"
-                output_path = output_folder / docx_filename
+            skipped_conversions = 0
+            done = 0
+            events = convert_tree(source_dir, output_dir, markdown_files=markdown_files,
+                                  cancel=self.cancel_requested, backend=backend, profiler=profiler)
+            for event in events:
+                if event.kind == 'started':
+                    continue
+                if event.kind == 'cancelled':
+                    if event.md_file is None:
+                        self.log_message("⏹️  Cancelled - no further files were started")
+                    else:
+                        self.log_message(f"⏹️  {event.md_file.relative_to(source_dir)} was not converted")
+                    continue
                 
-                relative_input = md_file.relative_to(source_dir)
-                relative_output = output_path.relative_to(output_dir)
-                
-                self.log_message(f"🔄 Converting: {relative_input}")
+                # Update progress
+                done += 1
+                self.set_progress(done / len(markdown_files) * 100)
+                self.set_status(f"Converted {done} of {len(markdown_files)} files")
                 
-                # Convert the file
-                if convert_markdown_to_docx(md_file, output_path):
+                relative_input = event.md_file.relative_to(source_dir)
+                relative_output = event.output_path.relative_to(output_dir)
+                if event.kind == 'skipped':
+                    skipped_conversions += 1
+                    self.log_message(f"⚠️  Skipping {relative_input}: {relative_output} is already produced by "
+                                     f"{event.owner.relative_to(source_dir)}", failure=True)
+                elif event.kind == 'converted':
                     successful_conversions += 1
-                    self.log_message(f"   ✅ Success → {relative_output}")
+                    self.log_message(f"✅ {relative_input} → {relative_output}")
                 else:
                     failed_conversions += 1
-                    self.log_message(f"   ❌ Failed")
+                    self.log_message(f"❌ {relative_input} failed: {event.error}", failure=True)
             
             # Final results
             self.log_message("-" * 50)
             self.log_message(f"🎉 Conversion complete!")
             self.log_message(f"✅ Successfully converted: {successful_conversions} files")
             if failed_conversions > 0:
-                self.log_message(f"❌ Failed conversions: {failed_conversions} files")
+                self.log_message(f"❌ Failed conversions: {failed_conversions} files", failure=True)
+            if skipped_conversions > 0:
+                self.log_message(f"⚠️  Skipped (same .docx name as another file): {skipped_conversions} files",
+                                 failure=True)
             self.log_message(f"📁 Output location: {output_dir}")
+            self.log_message(f"📝 Full log: {output_dir / LOG_FILE_NAME}")
+            
+            if profiler is not None:
+                profiler.finish()
+                self.log_message("-" * 50)
+                for line in profiler.summary_lines():
+                    self.log_message(line)
+                profile_path = output_dir / "profile.json"
+                profiler.write_json(profile_path)
+                self.log_message(f"⏱️  Profile written to {profile_path}")
             
-            self.status_var.set(f"Completed! {successful_conversions} files converted successfully")
+            if self.cancel_requested.is_set():
+                self.set_status(f"Cancelled after converting {successful_conversions} files")
+            else:
+                self.set_status(f"Completed! {successful_conversions} files converted successfully")
             
             # Ask if user wants to open output folder
             if successful_conversions > 0:
-                self.root.after(100, lambda: self.ask_open_folder(output_dir))
+                self.ui_events.put(("ask_open", (output_dir, successful_conversions, failed_conversions,
+                                                 skipped_conversions, self.cancel_requested.is_set())))
                 
         except Exception as e:
-            self.log_message(f"❌ Error during conversion: {str(e)}")
-            self.status_var.set("Conversion failed")
+            self.log_message(f"❌ Error during conversion: {str(e)}", failure=True)
+            self.set_status("Conversion failed")
         finally:
+            self.close_log_file()
             # Re-enable convert button
-            self.root.after(100, self.conversion_complete)
+            self.ui_events.put(("done", None))
     
     def conversion_complete(self):
         """Called when conversion is complete"""
@@ -270,11 +432,24 @@ class MarkdownConverterGUI:
         self.convert_button.configure(state="normal", text="Convert Files")
         self.progress_var.set(100)
     
-    def ask_open_folder(self, output_dir):
-        """Ask user if they want to open the output folder"""
-        result = messagebox.askyesno("Conversion Complete", 
-                                   "Conversion completed successfully!\n\n"
-                                   "Would you like to open the output folder to see your converted files?")
+    def ask_open_folder(self, output_dir, converted, failed=0, skipped=0, cancelled=False):
+        """Say how the conversion ended and ask if the user wants to open the output folder"""
+        if cancelled:
+            title = "Conversion Cancelled"
+            summary = f"Conversion was cancelled after converting {converted} files"
+        elif failed or skipped:
+            title = "Conversion Finished"
+            summary = f"{converted} files converted"
+        else:
+            title = "Conversion Complete"
+            summary = "Conversion completed successfully"
+        if failed:
+            summary += f", {failed} failed"
+        if skipped:
+            summary += f", {skipped} skipped (same .docx name as another file)"
+        summary += ". See the log for details." if failed or skipped else ("." if cancelled else "!")
+        result = messagebox.askyesno(title, summary + "\n\n"
+                                     "Would you like to open the output folder to see your converted files?")
         if result:
             self.open_folder(output_dir)
     
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Persistent Pandoc Server Backend
+
+Starting pandoc costs more than converting a short note, so for large
+batches of small files this module keeps a few long-lived `pandoc server`
+processes running on localhost and sends conversions to them over HTTP.
+
+The server has no access to the filesystem, so documents that reference
+local images are left to the normal subprocess path. Whenever the server
+is missing, crashes or rejects a document, callers fall back to pypandoc.
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import atexit
+import base64
+import itertools
+import json
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pypandoc
+
+# Seconds to wait for a freshly started server to answer
+STARTUP_TIMEOUT = 5
+# Seconds pandoc server may spend on one document (its own default is 2)
+REQUEST_TIMEOUT = 120
+
+
+class PandocServerUnavailable(Exception):
+    """Raised when a document cannot be converted through the server pool"""
+
+
+def _free_port():
+    """Ask the OS for an unused localhost port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PandocServerPool:
+    """A small round-robin pool of `pandoc server` processes"""
+
+    def __init__(self, size=2):
+        self.size = max(1, size)
+        self.processes = []
+        self.urls = []
+        self.available = False
+        self._next_url = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the servers; returns True if at least one is answering"""
+        try:
+            pandoc_path = pypandoc.get_pandoc_path()
+        except OSError:
+            return False
+
+        for _ in range(self.size):
+            port = _free_port()
+            try:
+                process = subprocess.Popen(
+                    [pandoc_path, "server", "--port", str(port), "--timeout", str(REQUEST_TIMEOUT)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError:
+                continue
+            self.processes.append(process)
+
+            url = f"http://127.0.0.1:{port}"
+            if self._wait_until_ready(process, url):
+                self.urls.append(url)
+            else:
+                process.terminate()
+
+        self.available = bool(self.urls)
+        self._next_url = itertools.cycle(self.urls)
+        atexit.register(self.stop)
+        return self.available
+
+    def _wait_until_ready(self, process, url):
+        """Poll the /version endpoint until the server answers or gives up"""
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                with urllib.request.urlopen(url + "/version", timeout=1):
+                    return True
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.1)
+        return False
+
+    def convert(self, md_file_path, output_path):
+        """Convert one markdown file to docx through the server pool"""
+        if not self.available:
+            raise PandocServerUnavailable("pandoc server is not running")
+
+        text = Path(md_file_path).read_text(encoding="utf-8")
+        if "![" in text:
+            # The server cannot read local images, so let pandoc embed them
+            raise PandocServerUnavailable("document references images")
+
+        payload = json.dumps({
+            "text": text,
+            "from": "markdown",
+            "to": "docx",
+            "standalone": True,
+        }).encode("utf-8")
+
+        with self._lock:
+            url = next(self._next_url)
+
+        req = urllib.request.Request(
+            url,
+            data=payload,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT + 5) as response:
+                result = json.loads(response.read().decode("utf-8"))
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            if isinstance(e, urllib.error.URLError) and not isinstance(e, urllib.error.HTTPError):
+                # Connection refused or reset - the server is gone for good
+                self.available = False
+            raise PandocServerUnavailable(str(e))
+
+        output = result.get("output", "")
+        data = base64.b64decode(output) if result.get("base64") else output.encode("utf-8")
+        if not data:
+            raise PandocServerUnavailable("pandoc server returned an empty document")
+        Path(output_path).write_bytes(data)
+
+    def stop(self):
+        """Terminate all server processes"""
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+        self.urls = []
+        self.available = False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_server_pool(size=2):
+    """Return the shared server pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PandocServerPool(size)
+            _pool.start()
+        return _pool
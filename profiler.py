@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Profiler
+
+Per-stage timing for finding out where a slow run spends its time, without
+reaching for cProfile. The converter reports into a Profiler as it goes:
+
+- walk: finding markdown files in the input folder
+- mkdir: creating output folders
+- cache: conversion cache lookups and stores
+- images: preparing optimized image copies
+- fast_path: writing simple documents in-process
+- split: converting very large files in pieces and merging them
+- pandoc_startup / pandoc_render: a pandoc run, split into the measured
+  cost of starting pandoc on an empty document and the rest
+
+Times are recorded per file and in total; report() returns everything as a
+JSON-friendly dict and summary_lines() a short text summary with the
+slowest files. The CLI (--profile), the GUI and the web interface all use it.
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_TOP = 10
+
+
+def measure_pandoc_startup(runs=3):
+    """Seconds pandoc needs to convert an empty document (best of runs), or None"""
+    try:
+        import pypandoc
+        command = [pypandoc.get_pandoc_path(), '--from', 'markdown', '--to', 'docx', '--output', os.devnull]
+    except (ImportError, OSError):
+        return None
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        try:
+            subprocess.run(command, input=b'', stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Profiler:
+    """Collects stage timings, per file and overall; safe to share between threads"""
+
+    def __init__(self, pandoc_startup=None):
+        self.pandoc_startup = pandoc_startup
+        self.started = time.perf_counter()
+        self.finished = None
+        self._lock = threading.Lock()
+        self._stages = {}  # stage -> [count, seconds]
+        self._files = {}   # file -> {stage: seconds}
+        self._totals = {}  # file -> seconds from start to end of its conversion
+        self._failed = set()
+
+    def add(self, stage, seconds, file=None):
+        """Record seconds spent in stage, for file if given"""
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            if file is not None:
+                stages = self._files.setdefault(str(file), {})
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage, file=None):
+        """Time the body of a with block as stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started, file)
+
+    @contextmanager
+    def pandoc(self, file=None, startup=True):
+        """Time a pandoc run, split into startup and rendering when startup was paid"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if startup and self.pandoc_startup is not None:
+                startup_seconds = min(self.pandoc_startup, elapsed)
+                self.add('pandoc_startup', startup_seconds, file)
+                self.add('pandoc_render', elapsed - startup_seconds, file)
+            else:
+                self.add('pandoc_render', elapsed, file)
+
+    @contextmanager
+    def file(self, file):
+        """Time one file's whole conversion; a raised error marks it failed"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self._failed.add(str(file))
+            raise
+        finally:
+            with self._lock:
+                self._totals[str(file)] = self._totals.get(str(file), 0.0) + time.perf_counter() - started
+
+    def timed_iter(self, stage, iterable):
+        """Pass items through, counting the time spent producing them as stage"""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - started)
+                return
+            self.add(stage, time.perf_counter() - started)
+            yield item
+
+    def finish(self):
+        """Stop the overall clock (report() otherwise uses the time it is called)"""
+        self.finished = time.perf_counter()
+
+    def report(self, top=DEFAULT_TOP):
+        """Everything recorded so far, as a dict ready for json.dump()"""
+        with self._lock:
+            wall = (self.finished or time.perf_counter()) - self.started
+            stages = {stage: {'count': count, 'seconds': round(seconds, 4)}
+                      for stage, (count, seconds) in sorted(self._stages.items(), key=lambda item: -item[1][1])}
+            files = [{'file': file,
+                      'seconds': round(seconds, 4),
+                      'failed': file in self._failed,
+                      'stages': {stage: round(value, 4) for stage, value in self._files.get(file, {}).items()}}
+                     for file, seconds in sorted(self._totals.items(), key=lambda item: -item[1])]
+        return {
+            'wall_seconds': round(wall, 4),
+            'files': len(files),
+            'pandoc_startup_seconds': None if self.pandoc_startup is None else round(self.pandoc_startup, 4),
+            'stages': stages,
+            'slowest': files[:top],
+            'per_file': files,
+        }
+
+    def summary_lines(self, top=DEFAULT_TOP):
+        """A short human-readable breakdown: time per stage and the slowest files"""
+        report = self.report(top)
+        lines = [f"Profile: {report['files']} files in {report['wall_seconds']:.2f}s"]
+        busy = sum(stage['seconds'] for stage in report['stages'].values()) or 1
+        for stage, entry in report['stages'].items():
+            lines.append(f"  {stage:<15} {entry['seconds']:>9.3f}s {entry['seconds'] / busy:>6.1%} "
+                         f"({entry['count']} calls)")
+        if report['slowest']:
+            lines.append(f"Slowest {len(report['slowest'])} files:")
+            for entry in report['slowest']:
+                detail = ', '.join(f"{stage} {value:.3f}s" for stage, value in entry['stages'].items())
+                failed = ' FAILED' if entry['failed'] else ''
+                lines.append(f"  {entry['seconds']:>8.3f}s  {entry['file']}{failed}" + (f"  ({detail})" if detail else ''))
+        return lines
+
+    def write_json(self, path, top=DEFAULT_TOP):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(top), f, indent=2)
+            f.write('\n')
+
+
+class NullProfiler:
+    """Stands in for a Profiler when profiling is off; records nothing"""
+
+    pandoc_startup = None
+
+    def add(self, stage, seconds, file=None):
+        pass
+
+    @contextmanager
+    def stage(self, stage, file=None):
+        yield
+
+    @contextmanager
+    def pandoc(self, file=None, startup=True):
+        yield
+
+    @contextmanager
+    def file(self, file):
+        yield
+
+    def timed_iter(self, stage, iterable):
+        return iterable
+
+
+NULL_PROFILER = NullProfiler()
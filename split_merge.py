@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Split and Merge
+
+Very large markdown files (generated API references and the like) can take
+pandoc many minutes and gigabytes of memory in one piece. split_markdown()
+cuts such a file into chunks at its top-level headings, never inside a
+fenced code block, so the chunks can be converted in parallel; merge_docx()
+then joins the converted chunks into a single DOCX.
+
+Merging appends each chunk's body to the first chunk's document and carries
+over what the body refers to: list numbering, styles, footnotes, hyperlink
+and image relationships and the images themselves. Every numeric ID from a
+later chunk is shifted past the IDs already used so nothing collides, and
+heading anchors that an earlier chunk already used are renamed the way
+pandoc would (intro-1, intro-2, ...) together with the links to them.
+
+Limitations: multi-paragraph reference definitions must sit in the chunk
+that uses them.
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import re
+import zipfile
+
+# Target size of one chunk; small enough for pandoc to handle comfortably
+DEFAULT_CHUNK_SIZE = 2 * 1024 * 1024
+
+ATX_HEADING_RE = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]|$)')
+SETEXT_H1_RE = re.compile(r'^ {0,3}=+[ \t]*$')
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+# [label]: url and single-line [^note]: text definitions, which may be used
+# anywhere in the document and so are copied into the chunks that use them
+DEFINITION_RE = re.compile(r'^ {0,3}\[([^\]]+)\]:[ \t]*\S')
+LABEL_RE = re.compile(r'\[([^\]\n]+)\]')
+
+# Numeric IDs in WordprocessingML that must stay unique across the document
+BODY_ID_RES = [
+    re.compile(r'(\bw:id=")(\d+)(")'),                                   # bookmarks, footnote references
+    re.compile(r'(<(?:wp:docPr|pic:cNvPr)\b[^>]*?\bid=")(\d+)(")'),      # drawings
+    re.compile(r'(\br:(?:id|embed|link|pict)="rId)(\d+)(")'),          # relationships
+    re.compile(r'(<w:numId w:val=")(\d+)(")'),                           # lists
+]
+NUMBERING_ID_RES = [
+    re.compile(r'(\bw:abstractNumId="|<w:abstractNumId w:val=")(\d+)(")'),
+    re.compile(r'(<w:num w:numId=")(\d+)(")'),
+]
+# Heading anchors and the internal links that point at them
+BOOKMARK_NAME_RE = re.compile(r'(<w:bookmarkStart\b[^>]*?\bw:name=")([^"]+)(")')
+ANCHOR_RE = re.compile(r'(\bw:anchor=")([^"]+)(")')
+DUPLICATE_NAME_RE = re.compile(r'(.+)-\d+$')
+RELATIONSHIP_RE = re.compile(r'<Relationship\b[^>]*/>')
+RELATIONSHIP_ID_RE = re.compile(r'(\bId="rId)(\d+)(")')
+STYLE_RE = re.compile(r'<w:style\b[^>]*\bw:styleId="([^"]+)".*?</w:style>', re.S)
+FOOTNOTE_RE = re.compile(r'<w:footnote\b(?![^>]*w:type=)[^>]*>.*?</w:footnote>', re.S)
+DEFAULT_TYPE_RE = re.compile(r'<Default\b[^>]*\bExtension="([^"]+)"[^>]*/>')
+
+# Seeded when the first chunk has no numbering part but a later one has lists
+EMPTY_NUMBERING = ('<?xml version="1.0" encoding="UTF-8"?>'
+                   '<w:numbering xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                   '</w:numbering>')
+NUMBERING_RELATIONSHIP = ('<Relationship Id="rId{}" Type="http://schemas.openxmlformats.org/officeDocument/'
+                          '2006/relationships/numbering" Target="numbering.xml"/>')
+NUMBERING_OVERRIDE = ('<Override PartName="/word/numbering.xml" ContentType="application/'
+                      'vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>')
+
+
+def _heading_level(line, next_line):
+    """Level of the heading starting at line (1 for setext ===), or None"""
+    match = ATX_HEADING_RE.match(line)
+    if match:
+        return len(match.group(1))
+    if next_line is not None and line.strip() and SETEXT_H1_RE.match(next_line):
+        return 1
+    return None
+
+
+def split_markdown(text, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split markdown text into chunks of roughly chunk_size characters.
+
+    Chunks only start at headings outside fenced code blocks. Level 1
+    headings are used where there are enough of them; otherwise level 2
+    and 3 headings are allowed as split points too. Link and one-line
+    footnote definitions are copied into every other chunk that uses their
+    label. Returns a list with a single item when the text cannot (or need
+    not) be split.
+    """
+    lines = text.splitlines(keepends=True)
+    headings = []  # (line index, level)
+    definitions = []  # (line index, lowercased label, line)
+    fence = None
+    for i, line in enumerate(lines):
+        match = FENCE_RE.match(line)
+        if fence is None and match:
+            fence = match.group(1)
+            continue
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            continue
+        next_line = lines[i + 1] if i + 1 < len(lines) else None
+        level = _heading_level(line, next_line)
+        if level is not None and i > 0:
+            headings.append((i, level))
+        else:
+            match = DEFINITION_RE.match(line)
+            if match:
+                definitions.append((i, match.group(1).lower(), line.rstrip('\n') + '\n'))
+
+    wanted = len(text) // chunk_size
+    if wanted < 1:
+        return [text]
+    max_level = 1
+    while max_level < 3 and sum(1 for _, level in headings if level <= max_level) < wanted:
+        max_level += 1
+    starts = [i for i, level in headings if level <= max_level]
+
+    ranges = []  # (first line, end line) of each chunk
+    first = 0
+    current_size = 0
+    boundaries = set(starts)
+    for i, line in enumerate(lines):
+        if i in boundaries and current_size >= chunk_size:
+            ranges.append((first, i))
+            first = i
+            current_size = 0
+        current_size += len(line)
+    ranges.append((first, len(lines)))
+
+    chunks = []
+    for first, end in ranges:
+        chunk = ''.join(lines[first:end])
+        if len(ranges) > 1 and definitions:
+            used = {label.lower() for label in LABEL_RE.findall(chunk)}
+            # Blank lines between them, or a footnote would swallow the next line
+            borrowed = [line for i, label, line in definitions if label in used and not first <= i < end]
+            if borrowed:
+                chunk += '\n\n' + '\n'.join(borrowed)
+        chunks.append(chunk)
+    return chunks
+
+
+def _shift(text, patterns, offset):
+    """Add offset to every numeric ID matched by patterns"""
+    for pattern in patterns:
+        text = pattern.sub(lambda m: f"{m.group(1)}{int(m.group(2)) + offset}{m.group(3)}", text)
+    return text
+
+
+def _max_id(text, patterns):
+    values = [int(match.group(2)) for pattern in patterns for match in pattern.finditer(text)]
+    return max(values, default=0)
+
+
+def _split_body(document):
+    """Return (before body content, body content, final sectPr and the rest)"""
+    start = document.index('<w:body>') + len('<w:body>')
+    end = document.rindex('</w:body>')
+    sect = document.rfind('<w:sectPr', start, end)
+    if sect == -1:
+        sect = end
+    return document[:start], document[start:sect], document[sect:]
+
+
+def _read(archive, name, default=''):
+    try:
+        return archive.read(name).decode('utf-8')
+    except KeyError:
+        return default
+
+
+class _MergedDocument:
+    """The first chunk's package, growing as later chunks are appended"""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.head, body, self.tail = _split_body(_read(archive, 'word/document.xml'))
+        self.body = [body]
+        self.rels = _read(archive, 'word/_rels/document.xml.rels')
+        self.footnote_rels = _read(archive, 'word/_rels/footnotes.xml.rels')
+        self.numbering = _read(archive, 'word/numbering.xml')
+        self.styles = _read(archive, 'word/styles.xml')
+        self.footnotes = _read(archive, 'word/footnotes.xml')
+        self.content_types = _read(archive, '[Content_Types].xml')
+        self.style_ids = set(STYLE_RE.findall(self.styles))
+        self.bookmarks = {match.group(2) for match in BOOKMARK_NAME_RE.finditer(body)}
+        self.media = {}  # new part name -> bytes
+        self.next_id = 1 + max(_max_id(body, BODY_ID_RES), _max_id(self.footnotes, BODY_ID_RES),
+                               _max_id(self.rels, [RELATIONSHIP_ID_RE]),
+                               _max_id(self.numbering, NUMBERING_ID_RES))
+        if '</w:numbering>' not in self.numbering:
+            # Later chunks' lists need somewhere to go
+            self._seed_numbering()
+
+    def _rename_bookmarks(self, body):
+        """
+        Map the bookmarks in body whose name an earlier chunk already uses to
+        free names, adding the names body ends up with to self.bookmarks.
+
+        pandoc numbers repeated headings within a chunk (intro, intro-1), so
+        all of a chunk's intro-N bookmarks are numbered on from the earlier
+        chunks' in order, as if the file had been converted in one piece.
+        """
+        names = [match.group(2) for match in BOOKMARK_NAME_RE.finditer(body)]
+        present = set(names)
+
+        def base(name):
+            match = DUPLICATE_NAME_RE.match(name)
+            return match.group(1) if match and match.group(1) in present else name
+
+        clashing = {base(name) for name in names if base(name) in self.bookmarks or name in self.bookmarks}
+        taken = self.bookmarks | {name for name in names if base(name) not in clashing}
+        renamed = {}
+        for name in names:
+            if base(name) in clashing and name not in renamed:
+                number = 1
+                while f"{base(name)}-{number}" in taken:
+                    number += 1
+                renamed[name] = f"{base(name)}-{number}"
+                taken.add(renamed[name])
+        self.bookmarks.update(renamed.get(name, name) for name in names)
+        return renamed
+
+    def _seed_numbering(self):
+        """Give a first chunk that has no numbering part an empty one"""
+        self.numbering = EMPTY_NUMBERING
+        self.rels = self.rels.replace('</Relationships>',
+                                      NUMBERING_RELATIONSHIP.format(self.next_id) + '</Relationships>')
+        self.content_types = self.content_types.replace('</Types>', NUMBERING_OVERRIDE + '</Types>')
+        self.next_id += 1
+
+    def _copy_relationships(self, rels, offset, chunk_number, archive):
+        """Shifted copies of the external and media relationships in rels"""
+        copied = []
+        for rel in RELATIONSHIP_RE.findall(rels):
+            target = re.search(r'\bTarget="([^"]+)"', rel).group(1)
+            if 'TargetMode="External"' not in rel and not target.startswith('media/'):
+                continue  # styles, numbering, ... exist once, in the first chunk
+            rel = _shift(rel, [RELATIONSHIP_ID_RE], offset)
+            if target.startswith('media/'):
+                new_target = f"media/chunk{chunk_number}_{target[len('media/'):]}"
+                self.media[f"word/{new_target}"] = archive.read(f"word/{target}")
+                rel = rel.replace(f'Target="{target}"', f'Target="{new_target}"')
+            copied.append(rel)
+        return ''.join(copied)
+
+    def append(self, archive, chunk_number):
+        offset = self.next_id
+        _, body, _ = _split_body(_read(archive, 'word/document.xml'))
+        body = _shift(body, BODY_ID_RES, offset)
+        renamed = self._rename_bookmarks(body)
+        if renamed:
+            def rename(match):
+                return match.group(1) + renamed.get(match.group(2), match.group(2)) + match.group(3)
+            body = ANCHOR_RE.sub(rename, BOOKMARK_NAME_RE.sub(rename, body))
+        self.body.append(body)
+
+        rels = self._copy_relationships(_read(archive, 'word/_rels/document.xml.rels'), offset, chunk_number, archive)
+        self.rels = self.rels.replace('</Relationships>', rels + '</Relationships>')
+
+        footnotes = _shift(''.join(FOOTNOTE_RE.findall(_read(archive, 'word/footnotes.xml'))), BODY_ID_RES, offset)
+        if footnotes and renamed:
+            footnotes = ANCHOR_RE.sub(rename, footnotes)
+        if footnotes:
+            self.footnotes = self.footnotes.replace('</w:footnotes>', footnotes + '</w:footnotes>')
+            footnote_rels = self._copy_relationships(_read(archive, 'word/_rels/footnotes.xml.rels'),
+                                                     offset, chunk_number, archive)
+            if footnote_rels:
+                self.footnote_rels = self.footnote_rels.replace('</Relationships>', footnote_rels + '</Relationships>')
+
+        numbering = _shift(_read(archive, 'word/numbering.xml'), NUMBERING_ID_RES, offset)
+        abstract = ''.join(re.findall(r'<w:abstractNum\b.*?</w:abstractNum>', numbering, re.S))
+        nums = ''.join(re.findall(r'<w:num\b[^>]*>.*?</w:num>', numbering, re.S))
+        if abstract or nums:
+            # Every abstractNum has to come before the first num
+            first_num = self.numbering.find('<w:num ')
+            if first_num == -1:
+                first_num = self.numbering.index('</w:numbering>')
+            self.numbering = self.numbering[:first_num] + abstract + self.numbering[first_num:]
+            self.numbering = self.numbering.replace('</w:numbering>', nums + '</w:numbering>')
+
+        # Highlighting and other styles are only written when a chunk uses them
+        for match in STYLE_RE.finditer(_read(archive, 'word/styles.xml')):
+            if match.group(1) not in self.style_ids:
+                self.style_ids.add(match.group(1))
+                self.styles = self.styles.replace('</w:styles>', match.group(0) + '</w:styles>')
+
+        known = set(DEFAULT_TYPE_RE.findall(self.content_types))
+        for match in DEFAULT_TYPE_RE.finditer(_read(archive, '[Content_Types].xml')):
+            if match.group(1) not in known:
+                known.add(match.group(1))
+                self.content_types = self.content_types.replace('</Types>', match.group(0) + '</Types>')
+
+        self.next_id = 1 + max(self.next_id, _max_id(body, BODY_ID_RES),
+                               _max_id(numbering, NUMBERING_ID_RES), _max_id(footnotes, BODY_ID_RES))
+
+    def write(self, output_path):
+        replaced = {
+            'word/document.xml': self.head + ''.join(self.body) + self.tail,
+            'word/_rels/document.xml.rels': self.rels,
+            'word/_rels/footnotes.xml.rels': self.footnote_rels,
+            'word/numbering.xml': self.numbering,
+            'word/styles.xml': self.styles,
+            'word/footnotes.xml': self.footnotes,
+            '[Content_Types].xml': self.content_types,
+        }
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as out:
+            for item in self.archive.infolist():
+                if item.filename in replaced:
+                    out.writestr(item.filename, replaced.pop(item.filename))
+                else:
+                    out.writestr(item, self.archive.read(item.filename))
+            # Parts the first chunk did not have, like a seeded numbering.xml
+            for name, data in replaced.items():
+                if data:
+                    out.writestr(name, data)
+            for name, data in self.media.items():
+                out.writestr(name, data)
+
+
+def merge_docx(docx_paths, output_path):
+    """Join DOCX files produced by pandoc from consecutive chunks into one"""
+    archives = [zipfile.ZipFile(path) for path in docx_paths]
+    try:
+        merged = _MergedDocument(archives[0])
+        for number, archive in enumerate(archives[1:], 1):
+            merged.append(archive, number)
+        merged.write(output_path)
+    finally:
+        for archive in archives:
+            archive.close()
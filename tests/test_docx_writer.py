@@ -0,0 +1,123 @@
+"""Checks that the native DOCX writer only takes documents it writes like pandoc"""
+
+import os
+import re
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx_writer
+
+try:
+    import pypandoc
+    pypandoc.get_pandoc_version()
+    HAVE_PANDOC = True
+except (ImportError, OSError):
+    HAVE_PANDOC = False
+
+
+def paragraph_texts(docx_path):
+    """Text of every non-empty paragraph in the document body"""
+    with zipfile.ZipFile(docx_path) as docx:
+        xml = docx.read('word/document.xml').decode('utf-8')
+    texts = []
+    for paragraph in re.findall(r'<w:p[ >].*?</w:p>', xml, re.S):
+        text = ''.join(re.findall(r'<w:t(?: [^>]*)?>([^<]*)</w:t>', paragraph))
+        if text:
+            texts.append(text)
+    return texts
+
+
+class BlockQuoteTests(unittest.TestCase):
+
+    def convert_both(self, markdown):
+        with tempfile.TemporaryDirectory() as work:
+            native = os.path.join(work, 'native.docx')
+            pandoc = os.path.join(work, 'pandoc.docx')
+            docx_writer.write_docx(markdown, native)
+            pypandoc.convert_text(markdown, 'docx', format='markdown', outputfile=pandoc)
+            return paragraph_texts(native), paragraph_texts(pandoc)
+
+    def test_multi_paragraph_quote_is_not_simple(self):
+        self.assertFalse(docx_writer.is_simple_markdown('> a\n>\n> b\n'))
+
+    def test_single_paragraph_quote_is_simple(self):
+        self.assertTrue(docx_writer.is_simple_markdown('> a\n> b\n'))
+
+    @unittest.skipUnless(HAVE_PANDOC, 'needs pandoc')
+    def test_single_paragraph_quote_matches_pandoc(self):
+        native, pandoc = self.convert_both('> a\n> b\n')
+        self.assertEqual(native, pandoc)
+
+    @unittest.skipUnless(HAVE_PANDOC, 'needs pandoc')
+    def test_fast_path_keeps_quote_paragraphs(self):
+        from markdown_to_docx_converter import convert_document
+        markdown = '> a\n>\n> b\n'
+        with tempfile.TemporaryDirectory() as work:
+            md_file = os.path.join(work, 'quote.md')
+            with open(md_file, 'w', encoding='utf-8') as f:
+                f.write(markdown)
+            fast = os.path.join(work, 'fast.docx')
+            convert_document(md_file, fast, fast_path=True)
+            _, pandoc = self.convert_both(markdown)
+            self.assertEqual(paragraph_texts(fast), pandoc)
+            self.assertEqual(pandoc, ['a', 'b'])
+
+
+# Lines pandoc folds into the block above them, or reads as a new list
+FOLDED_CASES = {
+    'heading after list item': '- a\n# H\n',
+    'heading after quote': '> q\n# H\n',
+    'quote after list item': '- a\n> q\n',
+    'list after quote': '> q\n- b\n',
+    'rule after list item': '- a\n---\n',
+    'rule after quote': '> q\n---\n',
+    'fence after list item': '- a\n```\nx\n```\n',
+    'delimiter change': '1) a\n2. b\n',
+    'delimiter change after blank line': '1. a\n\n2) b\n',
+    'bullet change': '- a\n* b\n',
+    'bullet to numbered': '- a\n1. b\n',
+}
+
+SIMPLE_CASES = {
+    'list': '- a\n- b\n',
+    'numbered list': '1. a\n2. b\n',
+    'heading then list': '# H\n\n- a\n- b\n',
+    'list then heading': '- a\n\n# H\n',
+    'heading then fence': '# H\n```\nx\n```\n',
+}
+
+
+class BlockStartTests(unittest.TestCase):
+
+    def test_folded_lines_are_not_simple(self):
+        for name, markdown in FOLDED_CASES.items():
+            with self.subTest(name):
+                self.assertFalse(docx_writer.is_simple_markdown(markdown))
+
+    def test_separated_blocks_are_simple(self):
+        for name, markdown in SIMPLE_CASES.items():
+            with self.subTest(name):
+                self.assertTrue(docx_writer.is_simple_markdown(markdown))
+
+    @unittest.skipUnless(HAVE_PANDOC, 'needs pandoc')
+    def test_fast_path_matches_pandoc(self):
+        from markdown_to_docx_converter import convert_document
+        with tempfile.TemporaryDirectory() as work:
+            for name, markdown in dict(FOLDED_CASES, **SIMPLE_CASES).items():
+                with self.subTest(name):
+                    md_file = os.path.join(work, 'case.md')
+                    with open(md_file, 'w', encoding='utf-8') as f:
+                        f.write(markdown)
+                    fast = os.path.join(work, 'fast.docx')
+                    pandoc = os.path.join(work, 'pandoc.docx')
+                    convert_document(md_file, fast, fast_path=True)
+                    pypandoc.convert_text(markdown, 'docx', format='markdown', outputfile=pandoc)
+                    self.assertEqual(paragraph_texts(fast), paragraph_texts(pandoc))
+
+
+if __name__ == '__main__':
+    unittest.main()
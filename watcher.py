@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Markdown to DOCX Converter - Folder Watcher
+
+Watches a folder tree for changes so --watch can reconvert only the files
+that were touched. On Linux the kernel's inotify interface is used directly
+through ctypes; everywhere else (or if inotify is unavailable) the tree is
+polled on an interval instead.
+
+Editors often write a file several times per save (temp file, rename,
+metadata update). iter_changes() waits until the tree has been quiet for a
+short debounce period and then reports each touched path once.
+
+Folders the converter never reads (excluded ones such as node_modules, or
+the output folder) are left unwatched, so they do not use up the per-user
+inotify watch limit. If a folder cannot be watched anyway (limit reached,
+no permission), a warning is printed and that folder is polled instead.
+
+Author: Brennan Kenneth Brown
+License: MIT
+"""
+
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 2.0
+# Never hold back a batch for longer than this while changes keep coming
+MAX_BATCH_DELAY = 5.0
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_ATTRIB)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _walk(directory, ignore=None):
+    """os.walk() that does not enter folders for which ignore(path) is true"""
+    for root, dirs, files in os.walk(directory):
+        if ignore is not None:
+            dirs[:] = [name for name in dirs if not ignore(Path(root) / name)]
+        yield root, dirs, files
+
+
+class InotifyWatcher:
+    """Recursive watcher built on Linux inotify"""
+
+    def __init__(self, root, ignore=None, interval=DEFAULT_POLL_INTERVAL):
+        import ctypes
+        import ctypes.util
+
+        self.root = Path(root)
+        self.ignore = ignore
+        self.interval = interval
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}  # watch descriptor -> directory
+        self._polled = {}   # directory -> PollingWatcher for trees inotify refused
+        self._add_tree(self.root)
+
+    def _add_watch(self, directory):
+        """Watch one folder; False if inotify refused it"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = Path(directory)
+            return True
+        error = self._get_errno()
+        if error in (errno.ENOENT, errno.ENOTDIR):
+            return True  # Removed in the meantime; nothing left to watch
+        reason = ("the inotify watch limit is reached (raise fs.inotify.max_user_watches)"
+                  if error == errno.ENOSPC else os.strerror(error))
+        print(f"Warning: cannot watch {directory}: {reason}; polling it every {self.interval:g}s instead")
+        return False
+
+    def _add_tree(self, directory):
+        """Watch directory and everything below it; returns the files found"""
+        found = set()
+        for root, dirs, files in _walk(directory, self.ignore):
+            path = Path(root)
+            if any(path == polled or polled in path.parents for polled in self._polled):
+                dirs[:] = []
+                continue
+            if not self._add_watch(root):
+                # The poller covers this folder and everything below it
+                self._polled[path] = PollingWatcher(path, self.interval, self.ignore)
+                dirs[:] = []
+            found.update(path / name for name in files)
+        return found
+
+    def wait(self, timeout=None):
+        """Block until something changes (or timeout); returns the touched paths"""
+        if self._polled:
+            timeout = self.interval if timeout is None else min(timeout, self.interval)
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        touched = set()
+        for poller in list(self._polled.values()):
+            touched.update(poller.check())
+        if not readable:
+            return touched
+
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # The kernel dropped events - report every file again
+                    touched.update(self._add_tree(self.root))
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / name
+                touched.add(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and not (self.ignore and self.ignore(path)):
+                    # Files may land in a new folder before its watch exists
+                    touched.update(self._add_tree(path))
+        return touched
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable watcher that compares directory snapshots"""
+
+    def __init__(self, root, interval=DEFAULT_POLL_INTERVAL, ignore=None):
+        self.root = Path(root)
+        self.interval = interval
+        self.ignore = ignore
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for root, dirs, files in _walk(self.root, self.ignore):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Poll until something changes (or timeout); returns the touched paths"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = max(0, min(delay, deadline - time.monotonic()))
+            time.sleep(delay)
+
+            touched = self.check()
+            if touched or (deadline is not None and time.monotonic() >= deadline):
+                return touched
+
+    def check(self):
+        """Paths that changed since the last scan, without waiting"""
+        snapshot = self._scan()
+        touched = {Path(path) for path in snapshot.keys() ^ self._snapshot.keys()}
+        touched.update(Path(path) for path, info in snapshot.items()
+                       if path in self._snapshot and self._snapshot[path] != info)
+        self._snapshot = snapshot
+        return touched
+
+    def close(self):
+        pass
+
+
+def create_watcher(root, polling=False, interval=DEFAULT_POLL_INTERVAL, ignore=None):
+    """
+    Return an inotify watcher where possible, otherwise a polling one.
+
+    Folders for which ignore(path) is true are neither watched nor scanned.
+    """
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, ignore, interval)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval, ignore)
+
+
+def iter_changes(root, debounce=DEFAULT_DEBOUNCE, polling=False, interval=DEFAULT_POLL_INTERVAL, ignore=None):
+    """
+    Yield sets of paths under root that changed, one set per burst of activity.
+
+    A burst ends once nothing has changed for `debounce` seconds (or after
+    MAX_BATCH_DELAY while changes keep coming), so a file saved five times
+    in a row is reported once. Folders for which ignore(path) is true are
+    not watched.
+    """
+    watcher = create_watcher(root, polling, interval, ignore)
+    try:
+        pending = set()
+        first_change = None
+        while True:
+            touched = watcher.wait(debounce if pending else None)
+            if touched:
+                if not pending:
+                    first_change = time.monotonic()
+                pending.update(touched)
+                if time.monotonic() - first_change < MAX_BATCH_DELAY:
+                    continue
+            if pending:
+                yield pending
+                pending = set()
+    finally:
+        watcher.close()